@@ -0,0 +1,29 @@
+import discord
+
+
+class EmojiCache:
+    """Resolves custom emojis from the gateway cache, only fetching on a miss."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.emojis = {}
+
+    async def get(self, guild, emoji_id):
+        emoji = self.emojis.get(emoji_id) or self.bot.get_emoji(emoji_id)
+        if emoji is None:
+            try:
+                emoji = await guild.fetch_emoji(emoji_id)
+            except discord.NotFound:
+                return None
+        self.emojis[emoji_id] = emoji
+        return emoji
+
+    def warm(self, guild):
+        for emoji in guild.emojis:
+            self.emojis[emoji.id] = emoji
+
+    def refresh(self, guild, emojis):
+        for emoji_id in [emoji_id for emoji_id, emoji in self.emojis.items() if emoji.guild_id == guild.id]:
+            del self.emojis[emoji_id]
+        for emoji in emojis:
+            self.emojis[emoji.id] = emoji
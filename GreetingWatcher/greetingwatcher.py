@@ -1,12 +1,31 @@
-from redbot.core import commands
-import datetime
+from redbot.core import Config, checks, commands
+from discord.ext import tasks
 import asyncio
+import datetime
+import re
 
+from .emojicache import EmojiCache
+from .reactionqueue import ReactionQueue
+
+
+def _build_hour_table(greetings_map):
+    table = [None] * 24
+    for greeting, (start_hour, end_hour) in greetings_map.items():
+        hour = start_hour
+        while hour != end_hour:
+            table[hour] = greeting
+            hour = (hour + 1) % 24
+    return tuple(table)
 
-class GreetingWatcher(commands.Cog):
-    gumo_streak = 0
-    gumo_users = []
 
+class Streak:
+    def __init__(self, count=0, users=()):
+        self.count = count
+        self.users = set(users)
+        self.lock = asyncio.Lock()
+
+
+class GreetingWatcher(commands.Cog):
     greetings_map = {
         "gumo": (6, 10),    # 6:00 - 9:59
         "guvomi": (10, 12), # 10:00 - 11:59
@@ -16,74 +35,191 @@ class GreetingWatcher(commands.Cog):
         "guna": (22, 6)     # 22:00 - 5:59
     }
 
+    # longest first, so "gunami" is never read as "guna"
+    greeting_pattern = re.compile(
+        r"\b(" + "|".join(sorted(greetings_map, key=len, reverse=True)) + r")\b",
+        re.IGNORECASE,
+    )
+
+    # hour of day -> greeting that is valid in that hour
+    greeting_by_hour = _build_hour_table(greetings_map)
+
     def __init__(self, bot):
         self.bot = bot
+        self.emoji_cache = EmojiCache(bot)
+        self.reactions = ReactionQueue()
+        self.config = Config.get_conf(self, identifier=1218208566817587362)
+        default_global = {
+            "channels": [1218208566817587362],
+            "emojis": {
+                "bedge": 1311619322187223120,
+                "feelsokman": 1240917116329263135,
+                "warndreieck": 1304388231835422780,
+                "grr": 1298594465497354260,
+            },
+        }
+        self.config.register_global(**default_global)
+        self.config.register_channel(streak=0, users=[])
+        self.channels = set()
+        self.emojis = {}
+        self.streaks = {}
+        self.dirty = set()
 
-    def is_greeting_correct(self, greeting):
-        now = datetime.datetime.now().hour
-        
+    async def cog_load(self):
+        self.channels = set(await self.config.channels())
+        self.emojis = await self.config.emojis()
+        for channel_id, data in (await self.config.all_channels()).items():
+            self.streaks[channel_id] = Streak(data["streak"], data["users"])
+        for guild in self.bot.guilds:
+            self.emoji_cache.warm(guild)
+        self.save_streaks.start()
+
+    async def cog_unload(self):
+        if router := self.bot.get_cog("MessageRouter"):
+            router.unregister(self)
+        self.save_streaks.cancel()
+        self.reactions.close()
+        await self.flush_streaks()
+
+    async def flush_streaks(self):
+        dirty, self.dirty = self.dirty, set()
+        for channel_id in dirty:
+            streak = self.streaks[channel_id]
+            async with self.config.channel_from_id(channel_id).all() as data:
+                data["streak"] = streak.count
+                data["users"] = list(streak.users)
+
+    @tasks.loop(seconds=60)
+    async def save_streaks(self):
+        await self.flush_streaks()
+
+    def message_route(self):
+        return {"channels": self.channels}
+
+    def update_route(self):
+        if router := self.bot.get_cog("MessageRouter"):
+            router.register(self)
+
+    async def get_emoji(self, guild, name):
+        return await self.emoji_cache.get(guild, self.emojis[name])
+
+    def is_greeting_correct(self, greeting, hour=None):
         if greeting not in GreetingWatcher.greetings_map:
             return True
-            
-        start_hour, end_hour = GreetingWatcher.greetings_map[greeting]
-        
-        if start_hour > end_hour:
-            return now >= start_hour or now < end_hour
-        else:
-            return start_hour <= now < end_hour
+
+        if hour is None:
+            hour = datetime.datetime.now().hour
+
+        return GreetingWatcher.greeting_by_hour[hour] == greeting
+
+    def find_greetings(self, content):
+        found = {match.lower() for match in GreetingWatcher.greeting_pattern.findall(content)}
+        return [greeting for greeting in GreetingWatcher.greetings_map if greeting in found]
+
+    @commands.Cog.listener()
+    async def on_guild_emojis_update(self, guild, before, after):
+        self.emoji_cache.refresh(guild, after)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload):
+        self.reactions.discard(payload.channel_id, payload.message_id)
 
     @commands.Cog.listener()
     async def on_message(self, message):
-        if message.channel.id != 1218208566817587362:
+        if message.channel.id not in self.channels:
             return
 
-        for greeting in GreetingWatcher.greetings_map:
-            if greeting in message.content.lower():
-                if self.is_greeting_correct(greeting):
-                    if greeting == "guna":
-                        bedge = await message.guild.fetch_emoji(1311619322187223120)
-                        await message.add_reaction(bedge)
-                    else:
-                        feelsokman = await message.guild.fetch_emoji(1240917116329263135)
-                        await message.add_reaction(feelsokman)
-                    await asyncio.sleep(0.25)
+        greetings = self.find_greetings(message.content)
+        hour = datetime.datetime.now().hour
+
+        for greeting in greetings:
+            if self.is_greeting_correct(greeting, hour):
+                if greeting == "guna":
+                    bedge = await self.get_emoji(message.guild, "bedge")
+                    self.reactions.add(message, bedge)
                 else:
-                    warndreieck = await message.guild.fetch_emoji(1304388231835422780)
-                    await message.add_reaction(warndreieck)
+                    feelsokman = await self.get_emoji(message.guild, "feelsokman")
+                    self.reactions.add(message, feelsokman)
+            else:
+                warndreieck = await self.get_emoji(message.guild, "warndreieck")
+                self.reactions.add(message, warndreieck)
 
         
         # streak
 
-        if "gumo" in message.content.lower() and message.author.id not in GreetingWatcher.gumo_users and self.is_greeting_correct("gumo"):
-            GreetingWatcher.gumo_streak += 1
-            GreetingWatcher.gumo_users.append(message.author.id)
-
-            streak = GreetingWatcher.gumo_streak
-            if streak < 33 and streak >= 3:
-                if streak == 11:
-                    emojis = ["⏸️"]
-                elif streak == 22:
-                    emojis = ["2️⃣", "🥈"]
-                elif streak <= 10:
-                    emojis = ["🔟"] if streak == 10 else [ { '0': "0️⃣", '1': "1️⃣", '2': "2️⃣", 
-                                                              '3': "3️⃣", '4': "4️⃣", '5': "5️⃣", 
-                                                              '6': "6️⃣", '7': "7️⃣", '8': "8️⃣", 
-                                                              '9': "9️⃣" }[str(streak)] ]
-                else:
-                    emojis = [ { '0': "0️⃣", '1': "1️⃣", '2': "2️⃣", 
-                                  '3': "3️⃣", '4': "4️⃣", '5': "5️⃣", 
-                                  '6': "6️⃣", '7': "7️⃣", '8': "8️⃣", 
-                                  '9': "9️⃣" }[d] for d in str(streak) ]
-                for emoji in emojis:
-                    await message.add_reaction(emoji)
-                    await asyncio.sleep(0.25)
-        else:
-            if GreetingWatcher.gumo_streak >= 3:
-                grr = await message.guild.fetch_emoji(1298594465497354260)
-                await message.add_reaction(grr)
-            GreetingWatcher.gumo_streak = 0
-            GreetingWatcher.gumo_users = []
+        streak = self.streaks.get(message.channel.id)
+        if streak is None:
+            streak = self.streaks[message.channel.id] = Streak()
+
+        async with streak.lock:
+            if "gumo" in greetings and message.author.id not in streak.users and self.is_greeting_correct("gumo", hour):
+                streak.count += 1
+                streak.users.add(message.author.id)
+                self.dirty.add(message.channel.id)
+
+                count = streak.count
+                if count < 33 and count >= 3:
+                    if count == 11:
+                        emojis = ["⏸️"]
+                    elif count == 22:
+                        emojis = ["2️⃣", "🥈"]
+                    elif count <= 10:
+                        emojis = ["🔟"] if count == 10 else [ { '0': "0️⃣", '1': "1️⃣", '2': "2️⃣", 
+                                                                 '3': "3️⃣", '4': "4️⃣", '5': "5️⃣", 
+                                                                 '6': "6️⃣", '7': "7️⃣", '8': "8️⃣", 
+                                                                 '9': "9️⃣" }[str(count)] ]
+                    else:
+                        emojis = [ { '0': "0️⃣", '1': "1️⃣", '2': "2️⃣", 
+                                      '3': "3️⃣", '4': "4️⃣", '5': "5️⃣", 
+                                      '6': "6️⃣", '7': "7️⃣", '8': "8️⃣", 
+                                      '9': "9️⃣" }[d] for d in str(count) ]
+                    for emoji in emojis:
+                        self.reactions.add(message, emoji)
+            elif streak.count or streak.users:
+                if streak.count >= 3:
+                    grr = await self.get_emoji(message.guild, "grr")
+                    self.reactions.add(message, grr)
+                streak.count = 0
+                streak.users = set()
+                self.dirty.add(message.channel.id)
+
+    @commands.group(aliases=["gw"])
+    @checks.is_owner()
+    async def greetingwatcher(self, ctx: commands.Context):
+        """Configure GreetingWatcher"""
+
+    @greetingwatcher.command(name="addchannel")
+    async def greetingwatcher_addchannel(self, ctx: commands.Context, channel_id: int):
+        """Watch a channel for greetings"""
+        self.channels.add(channel_id)
+        await self.config.channels.set(list(self.channels))
+        self.update_route()
+        await ctx.tick()
+
+    @greetingwatcher.command(name="removechannel")
+    async def greetingwatcher_removechannel(self, ctx: commands.Context, channel_id: int):
+        """Stop watching a channel"""
+        self.channels.discard(channel_id)
+        await self.config.channels.set(list(self.channels))
+        self.update_route()
+        await ctx.tick()
+
+    @greetingwatcher.command(name="emoji")
+    async def greetingwatcher_emoji(self, ctx: commands.Context, name: str, emoji_id: int):
+        """Set the emoji ID used for bedge, feelsokman, warndreieck or grr"""
+        if name not in self.emojis:
+            await ctx.send(f"Unknown emoji `{name}`, use one of: {', '.join(self.emojis)}")
+            return
+        self.emojis[name] = emoji_id
+        await self.config.emojis.set(self.emojis)
+        await ctx.tick()
 
+    @greetingwatcher.command(name="settings")
+    async def greetingwatcher_settings(self, ctx: commands.Context):
+        """Show watched channels and emojis"""
+        channels = " ".join(f"<#{channel_id}>" for channel_id in self.channels) or "None"
+        emojis = "\n".join(f"{name}: `{emoji_id}`" for name, emoji_id in self.emojis.items())
+        await ctx.send(f"Channels: {channels}\n{emojis}")
 
 async def setup(bot):
     await bot.add_cog(GreetingWatcher(bot))
@@ -0,0 +1,54 @@
+import asyncio
+import discord
+
+
+class ReactionQueue:
+    """Adds reactions in the background with one ordered worker per channel.
+
+    Pacing is left to discord.py, which waits on the reaction rate-limit
+    bucket before each request instead of sleeping a fixed time.
+    """
+
+    def __init__(self):
+        self.queues = {}
+        self.workers = {}
+        self.deleted = {}
+
+    def add(self, message, emoji):
+        if emoji is None:
+            return
+
+        channel_id = message.channel.id
+        queue = self.queues.get(channel_id)
+        if queue is None:
+            queue = self.queues[channel_id] = asyncio.Queue()
+            self.deleted[channel_id] = set()
+            self.workers[channel_id] = asyncio.create_task(self.worker(channel_id, queue))
+        queue.put_nowait((message, emoji))
+
+    def discard(self, channel_id, message_id):
+        if channel_id in self.deleted:
+            self.deleted[channel_id].add(message_id)
+
+    async def worker(self, channel_id, queue):
+        deleted = self.deleted[channel_id]
+        while True:
+            message, emoji = await queue.get()
+            if message.id not in deleted:
+                try:
+                    await message.add_reaction(emoji)
+                except discord.NotFound:
+                    deleted.add(message.id)
+                except Exception as e:
+                    # anything else (a dropped connection, a timeout) must not end the worker,
+                    # or this channel's queue would fill up with reactions nobody adds
+                    print(e)
+            if queue.empty():
+                deleted.clear()
+
+    def close(self):
+        for worker in self.workers.values():
+            worker.cancel()
+        self.queues.clear()
+        self.workers.clear()
+        self.deleted.clear()
@@ -0,0 +1,625 @@
+"""Offline load tests for the cogs, no Discord connection needed.
+
+Runs the cogs against the fake Bot/Guild/Channel/Message/Context objects from
+``tests.fakes``, the vanilla-like RCON server from ``tests.rconstub`` and the
+srrDB/xREL/Perplexity/paste host stand-ins from ``tests.httpstub``:
+
+    python -m bench.harness                      # every scenario
+    python -m bench.harness listeners --router --concurrency 200
+    python -m bench.harness whitelist --rcon-latency 0.002 --names 5
+    python -m bench.harness nfo perplexity --requests 100 --http-latency 0.02
+    python -m bench.harness --save-baseline bench/baseline.json
+    python -m bench.harness --baseline bench/baseline.json
+
+Scenarios:
+    listeners  a generated chat corpus through the on_message listeners of
+               XCancel, Medal, Kicker and GreetingWatcher, each listener in a
+               task of its own like discord.py does, or with --router through
+               MessageRouter
+    whitelist  concurrent ``[p]whitelistadd`` invocations over an RconPool
+    micro      per-call cost of the hot paths: greeting matcher, XCancel and
+               router rejection of ordinary chat, a Kicker RuleSet with
+               thousands of rules, pooled vs per-call RCON connections
+    imports    cold and warm import time of every cog, each in a fresh process
+    nfo        concurrent ``[p]nfo`` lookups of releases found on xREL (scene
+               or P2P) or nowhere; srrDB is queried for every one, but hits
+               there need the iNFEKT renderer, which isn't part of the repo
+    perplexity concurrent ``do_perplexity`` calls, each uploading its
+               reasoning to the paste host; includes the cog's 0.5 s pause
+               after every message chunk
+    availability
+               concurrent ``AvailabilityChecker.check_status`` runs against a
+               page that goes in and out of stock
+
+Scenarios whose HTTP clients (requests, curl, aiohttp, openai) aren't
+installed are skipped, the fakes only stand in for Discord and Red.
+
+Every scenario reports throughput, latency percentiles and event loop lag
+(plus the tracemalloc peak with --memory) where it applies. Results are
+compared against a baseline saved with --save-baseline.
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from tests import fakes
+
+fakes.install()
+
+from AvailabilityChecker.availabilitychecker import AvailabilityChecker  # noqa: E402
+from getnfo.getnfo import getnfo  # noqa: E402
+from GreetingWatcher.greetingwatcher import GreetingWatcher  # noqa: E402
+from kicker.kicker import RuleSet, Kicker  # noqa: E402
+from medal.medal import Medal  # noqa: E402
+from msgrouter.msgrouter import MessageRouter  # noqa: E402
+from pplx_api.pplx_api import PerplexityAI  # noqa: E402
+from rcon.rconclient import RconConnection, RconPool  # noqa: E402
+from rcon.rconcog import RconCog  # noqa: E402
+from tests.fakes import FakeAuthor, FakeBot, FakeChannel, FakeContext, FakeGuild, FakeMessage  # noqa: E402
+from tests.httpstub import StubHttpServer  # noqa: E402
+from tests.rconstub import VanillaRconServer  # noqa: E402
+from xcancel.xcancel import XCancel  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GREETING_CHANNEL = 1218208566817587362
+BRIDGE_CHANNEL = 793150452430274601
+MEDAL_CHANNEL = 1349869798103842866
+MEDAL_USER = 307998818547531777
+KICKER_LOG_CHANNEL = 707383988200800358
+
+WORDS = (
+    "ja", "nein", "heute", "morgen", "server", "spielen", "lol", "gg", "wer", "ist", "online", "kurz", "afk",
+    "essen", "minecraft", "update", "neue", "welt", "bauen", "haus", "farm", "diamanten", "creeper", "nether",
+    "the", "a", "link", "video", "clip", "stream", "heute abend", "guna", "gunami", "gumo", "danke", "bitte",
+)
+MEDAL_LINK = "[Medal.tv](https://medal.tv/?utm_source=discord&utm_content=share_message)"
+
+# metrics where a bigger number is better, everything else is a time or a size
+HIGHER_IS_BETTER = ("throughput",)
+
+
+class Skipped(Exception):
+    pass
+
+
+def require(packages=(), programs=()):
+    absent = [name for name in packages if name in fakes.FAKED or importlib.util.find_spec(name) is None]
+    absent += [name for name in programs if shutil.which(name) is None]
+    if absent:
+        raise Skipped(f"not installed: {', '.join(absent)}")
+
+
+# --- measuring ----------------------------------------------------------------------
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class LagProbe:
+    """Ticks every few milliseconds and records how late each tick woke up."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = []
+        self.task = None
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - start - self.interval))
+
+    def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    def stop(self):
+        self.task.cancel()
+
+
+async def drive(items, worker, concurrency):
+    """Runs ``worker(item)`` for every item with at most ``concurrency`` at a time.
+
+    Returns the per-item latencies and the wall time of the whole run, while a
+    LagProbe watches the event loop.
+    """
+    items = iter(items)
+    latencies = []
+    probe = LagProbe()
+    probe.start()
+
+    async def consume():
+        for item in items:
+            start = time.perf_counter()
+            await worker(item)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(consume() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    probe.stop()
+    return latencies, wall, probe.samples
+
+
+def summarize(latencies, wall, lag):
+    return {
+        "throughput": len(latencies) / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "lag_p99_ms": percentile(lag, 0.99) * 1000,
+        "lag_max_ms": max(lag, default=0.0) * 1000,
+    }
+
+
+def per_call(func, items, repeat=3):
+    """Best of ``repeat`` runs of ``func`` over all items, in microseconds per item."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return best / len(items) * 1e6
+
+
+def run_fast_path(coro):
+    # steps a handler that is expected to return without awaiting anything
+    try:
+        coro.send(None)
+    except StopIteration:
+        return
+    coro.close()
+    raise RuntimeError("handler suspended on what should be its fast path")
+
+
+# --- fixtures -------------------------------------------------------------------------
+
+
+def make_corpus(count, seed=40):
+    """Chat as it looks in a busy guild: mostly plain messages, some links, greetings and bridge lines."""
+    rng = random.Random(seed)
+    guild = FakeGuild()
+    channels = {channel_id: FakeChannel(channel_id, guild=guild) for channel_id in (GREETING_CHANNEL, BRIDGE_CHANNEL, MEDAL_CHANNEL)}
+    chatter = [FakeChannel(guild=guild) for _ in range(20)]
+    authors = [FakeAuthor() for _ in range(200)]
+    bridge_names = [f"Player_{index}" for index in range(50)]
+
+    messages = []
+    for index in range(count):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 12)))
+        roll = rng.random()
+        if roll < 0.06:
+            host = rng.choice(("x.com", "twitter.com", "www.x.com"))
+            message = FakeMessage(f"{text} https://{host}/user{index}/status/{index}", author=rng.choice(authors),
+                                  channel=rng.choice(chatter))
+        elif roll < 0.09:
+            message = FakeMessage(f"https://youtube.com/watch?v={index} {text}", author=rng.choice(authors),
+                                  channel=rng.choice(chatter))
+        elif roll < 0.14:
+            message = FakeMessage(rng.choice(("gumo", "Gumo zusammen", "guna", "gunami")), author=rng.choice(authors),
+                                  channel=channels[GREETING_CHANNEL])
+        elif roll < 0.24:
+            if rng.random() < 0.05:
+                text += " sex"
+            message = FakeMessage(f"{rng.choice(bridge_names)}: {text}", author=rng.choice(authors),
+                                  channel=channels[BRIDGE_CHANNEL])
+        elif roll < 0.26:
+            message = FakeMessage(f"{text} {MEDAL_LINK}", author=FakeAuthor(MEDAL_USER), channel=channels[MEDAL_CHANNEL])
+        else:
+            message = FakeMessage(text, author=rng.choice(authors), channel=rng.choice(chatter))
+        messages.append(message)
+    return guild, messages
+
+
+async def start_rcon(latency):
+    return await VanillaRconServer(latency=latency).start()
+
+
+def drop_session(cog):
+    # t.co lookups are stubbed out, so XCancel needs no HTTP session
+    cog.session = None
+
+    async def resolve_tco(code):
+        return None
+
+    cog.resolve_tco = resolve_tco
+
+
+async def load_listener_cogs(bot, server, router):
+    bot.channels[KICKER_LOG_CHANNEL] = FakeChannel(KICKER_LOG_CHANNEL)
+    rcon = RconCog(bot)
+    rcon.rcon = RconPool("127.0.0.1", server.port, server.password)
+    bot.add_cog_sync(rcon)
+
+    if router:
+        await bot.add_cog(MessageRouter(bot))
+    cogs = []
+    for cog_class in (XCancel, Medal, Kicker, GreetingWatcher):
+        cog = cog_class(bot)
+        await bot.add_cog(cog)
+        if isinstance(cog, XCancel):
+            if asyncio.iscoroutinefunction(getattr(cog.session, "close", None)):
+                await cog.session.close()
+            drop_session(cog)
+        cogs.append(cog)
+    return rcon, cogs
+
+
+async def unload(bot):
+    for cog in list(bot.cogs.values()):
+        if hasattr(cog, "cog_unload"):
+            result = cog.cog_unload()
+            if asyncio.iscoroutine(result):
+                await result
+
+
+async def cancel_leftovers():
+    # e.g. Medal's pending bulk deletes, which would otherwise wait out their delay
+    leftover = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    for task in leftover:
+        task.cancel()
+    await asyncio.gather(*leftover, return_exceptions=True)
+
+
+# --- scenarios ------------------------------------------------------------------------
+
+
+async def bench_listeners(args):
+    server = await start_rcon(args.rcon_latency)
+    bot = FakeBot()
+    _, messages = make_corpus(args.messages)
+    rcon, cogs = await load_listener_cogs(bot, server, args.router)
+
+    router = bot.get_cog("MessageRouter")
+    spawned = {}
+    handler_time = {}
+    if router is not None:
+        # the router schedules the handlers itself; remember their tasks so a
+        # message only counts as handled once all of them are done
+        run = router.run
+
+        async def tracked_run(route, message):
+            spawned.setdefault(message.id, []).append(asyncio.current_task())
+            await run(route, message)
+
+        def observe(cog_name, event_name, seconds):
+            handler_time[cog_name] = handler_time.get(cog_name, 0.0) + seconds
+
+        router.run = tracked_run
+        router.observer = observe
+        listeners = [router.on_message]
+    else:
+        listeners = [cog.on_message for cog in cogs]
+
+    async def dispatch(message):
+        # discord.py runs every listener in a task of its own
+        await asyncio.gather(*(asyncio.create_task(listener(message)) for listener in listeners))
+        if router is not None:
+            await asyncio.sleep(0)
+            await asyncio.gather(*spawned.pop(message.id, ()))
+
+    latencies, wall, lag = await drive(messages, dispatch, args.concurrency)
+    result = summarize(latencies, wall, lag)
+    result["rcon_commands"] = len(server.commands)
+    for cog_name, seconds in sorted(handler_time.items()):
+        result[f"{cog_name}_us_per_message"] = seconds / len(messages) * 1e6
+
+    await unload(bot)
+    await server.close()
+    await cancel_leftovers()
+    return result
+
+
+async def bench_whitelist(args):
+    server = await start_rcon(args.rcon_latency)
+    bot = FakeBot()
+    cog = RconCog(bot)
+    cog.rcon = RconPool("127.0.0.1", server.port, server.password, size=args.pool_size)
+    channel = FakeChannel(guild=FakeGuild())
+    failures = []
+
+    async def invoke(index):
+        usernames = [f"p{index}x{name}" for name in range(args.names)]
+        ctx = FakeContext(bot, FakeMessage("!whitelistadd " + " ".join(usernames), channel=channel))
+        await cog.whitelistadd(ctx, *usernames)
+        if ctx.message.reactions != ["✅"]:
+            failures.append(ctx.sent)
+
+    latencies, wall, lag = await drive(range(args.invocations), invoke, args.concurrency)
+    result = summarize(latencies, wall, lag)
+    result["failures"] = len(failures)
+    result["dropped_connections"] = server.dropped
+
+    await cog.cog_unload()
+    await server.close()
+    return result
+
+
+async def bench_micro(args):
+    bot = FakeBot()
+    _, messages = make_corpus(5000)
+    plain = [message for message in messages if message.channel.id not in (GREETING_CHANNEL, BRIDGE_CHANNEL, MEDAL_CHANNEL)
+             and "://" not in message.content]
+    result = {}
+
+    greetings = GreetingWatcher(bot)
+    result["greeting_match_us"] = per_call(
+        lambda message: [greetings.is_greeting_correct(found, 7) for found in greetings.find_greetings(message.content)],
+        messages,
+    )
+
+    xcancel = XCancel(bot)
+    drop_session(xcancel)
+    result["xcancel_no_match_us"] = per_call(lambda message: run_fast_path(xcancel.on_message(message)), plain)
+
+    server = await start_rcon(0.0)
+    _, cogs = await load_listener_cogs(bot, server, router=True)
+    router = bot.get_cog("MessageRouter")
+    result["router_reject_us"] = per_call(lambda message: run_fast_path(router.on_message(message)), plain)
+    result["fanout_reject_us"] = per_call(
+        lambda message: [run_fast_path(cog.on_message(message)) for cog in cogs], plain
+    )
+    await unload(bot)
+
+    rng = random.Random(34)
+
+    def needle():
+        return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 10)))
+
+    rules = [{"matcher": "literal", "pattern": needle(), "action": "kick"} for _ in range(args.rules * 6 // 10)]
+    rules += [{"matcher": "words", "pattern": f"{needle()} {needle()}", "action": "warn"} for _ in range(args.rules * 3 // 10)]
+    rules += [{"matcher": "regex", "pattern": rf"{needle()}[\s_-]*{needle()}\d*", "action": "log"} for _ in range(args.rules // 10)]
+    rng.shuffle(rules)
+    start = time.perf_counter()
+    ruleset = RuleSet(rules)
+    result["ruleset_compile_ms"] = (time.perf_counter() - start) * 1000
+    texts = [message.content for message in messages]
+    result["ruleset_match_us"] = per_call(ruleset.match, texts)
+
+    pool = RconPool("127.0.0.1", server.port, server.password)
+    await pool.command("echo warm")
+    start = time.perf_counter()
+    for _ in range(args.rcon_calls):
+        await pool.command("echo hi")
+    result["rcon_pooled_us"] = (time.perf_counter() - start) / args.rcon_calls * 1e6
+    start = time.perf_counter()
+    for _ in range(args.rcon_calls):
+        # what every command used to cost: connect, authenticate, run, disconnect
+        connection = RconConnection("127.0.0.1", server.port, server.password)
+        await connection.connect()
+        await connection.command("echo hi")
+        connection.close()
+    result["rcon_per_call_us"] = (time.perf_counter() - start) / args.rcon_calls * 1e6
+    await pool.close()
+    await server.close()
+    await cancel_leftovers()
+    return result
+
+
+async def bench_nfo(args):
+    require(packages=("requests",), programs=("curl",))
+    releases = [f"Stub.Release.{index}.German.1080p.WEB.h264-GRP" for index in range(args.requests)]
+    bot = FakeBot()
+    channel = FakeChannel(guild=FakeGuild())
+    failures = []
+
+    with StubHttpServer(latency=args.http_latency) as stub:
+        stub.xrel_releases.update(releases[0::3])
+        stub.p2p_releases.update(releases[1::3])
+        cog = getnfo(bot)
+        cog.xrel_api_base_url = f"{stub.url}/xrel/v2"
+        cog.srrdb_api_base_url = f"{stub.url}/srrdb/v1/nfo/"
+        await bot.add_cog(cog)
+
+        async def invoke(release):
+            ctx = FakeContext(bot, FakeMessage(f"!nfo {release}", channel=channel))
+            await cog.nfo(ctx, release=release)
+            if not ctx.sent or ctx.sent[-1] == "Failed to process NFO response.":
+                failures.append(release)
+
+        latencies, wall, lag = await drive(releases, invoke, args.concurrency)
+        result = summarize(latencies, wall, lag)
+        result["failures"] = len(failures)
+        result["http_requests"] = len(stub.requests)
+
+        await unload(bot)
+        await cancel_leftovers()
+    return result
+
+
+async def bench_perplexity(args):
+    require(packages=("aiohttp", "openai"))
+    bot = FakeBot()
+    bot.shared_api_tokens["perplexity"] = {"api_key": "stub-key"}
+    channel = FakeChannel(guild=FakeGuild())
+    failures = []
+
+    with StubHttpServer(latency=args.http_latency) as stub:
+        cog = PerplexityAI(bot)
+        cog.api_base_url = f"{stub.url}/pplx"
+        cog.paste_url = f"{stub.url}/paste"
+        await bot.add_cog(cog)
+
+        async def invoke(index):
+            ctx = FakeContext(bot, FakeMessage(f"!pplx Frage {index}", channel=channel))
+            await cog.do_perplexity(ctx, f"Frage {index}")
+            if "Die Antwort ist 42." not in ctx.sent:
+                failures.append(ctx.sent)
+
+        latencies, wall, lag = await drive(range(args.requests), invoke, args.concurrency)
+        result = summarize(latencies, wall, lag)
+        result["failures"] = len(failures)
+        result["pastes"] = len(stub.pastes)
+
+        await unload(bot)
+        await cancel_leftovers()
+    return result
+
+
+async def bench_availability(args):
+    require(packages=("aiohttp",))
+    bot = FakeBot()
+    channel = FakeChannel(guild=FakeGuild())
+    bot.channels[channel.id] = channel
+
+    with StubHttpServer(latency=args.http_latency) as stub:
+        cog = AvailabilityChecker(bot)
+        cog.url = f"{stub.url}/page"
+        cog.channel_id = channel.id
+        cog.search_string = "Auf Lager"
+        cog.found_message = "Wieder auf Lager"
+        cog.not_found_message = "Ausverkauft"
+        await bot.add_cog(cog)
+
+        async def check(index):
+            # restocked and sold out every 10 checks, so both notifications go out
+            stub.page = "<html>Auf Lager</html>" if index // 10 % 2 == 0 else "<html>Ausverkauft</html>"
+            await cog.check_status()
+
+        latencies, wall, lag = await drive(range(args.requests), check, args.concurrency)
+        result = summarize(latencies, wall, lag)
+        result["notifications"] = len(channel.sent)
+
+        await unload(bot)
+        await cancel_leftovers()
+    return result
+
+
+IMPORT_PROBE = """
+import importlib, json, sys, time
+from tests import fakes
+fakes.install()
+package = sys.argv[1]
+start = time.perf_counter()
+importlib.import_module(package)
+cold = time.perf_counter() - start
+for name in [name for name in sys.modules if name == package or name.startswith(package + ".")]:
+    del sys.modules[name]
+start = time.perf_counter()
+importlib.import_module(package)
+warm = time.perf_counter() - start
+print(json.dumps({"cold": cold, "warm": warm}))
+"""
+
+
+def cog_packages():
+    return sorted(
+        name for name in os.listdir(ROOT)
+        if name not in ("tests", "bench") and os.path.isfile(os.path.join(ROOT, name, "__init__.py"))
+    )
+
+
+async def bench_imports(args):
+    # cold is the first import in a fresh process, warm is a [p]reload: the cog's
+    # own modules are imported again while its dependencies stay loaded
+    result = {}
+    for package in cog_packages():
+        probe = subprocess.run([sys.executable, "-c", IMPORT_PROBE, package], cwd=ROOT, capture_output=True, text=True)
+        if probe.returncode != 0:
+            print(f"  {package}: import failed: {probe.stderr.strip().splitlines()[-1]}")
+            continue
+        times = json.loads(probe.stdout)
+        result[f"{package}_cold_ms"] = times["cold"] * 1000
+        result[f"{package}_warm_ms"] = times["warm"] * 1000
+    return result
+
+
+SCENARIOS = {
+    "listeners": bench_listeners,
+    "whitelist": bench_whitelist,
+    "micro": bench_micro,
+    "imports": bench_imports,
+    "nfo": bench_nfo,
+    "perplexity": bench_perplexity,
+    "availability": bench_availability,
+}
+
+
+# --- reporting ------------------------------------------------------------------------
+
+
+def compare(metric, value, before):
+    if before is None or not before:
+        return ""
+    change = (value - before) / before * 100
+    worse = change < 0 if metric.startswith(HIGHER_IS_BETTER) else change > 0
+    return f"  {change:+7.1f}%{'  worse' if worse and abs(change) >= 10 else ''}"
+
+
+def report(name, result, baseline):
+    print(f"{name}:")
+    for metric, value in result.items():
+        print(f"  {metric:<32} {value:>12.2f}{compare(metric, value, baseline.get(metric))}")
+
+
+async def run_scenario(name, args):
+    if args.memory:
+        tracemalloc.start()
+    try:
+        result = await SCENARIOS[name](args)
+        if args.memory:
+            result["memory_peak_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        if args.memory:
+            tracemalloc.stop()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline load tests for the cogs.")
+    parser.add_argument("scenarios", nargs="*", metavar="scenario", help=f"any of {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--concurrency", type=int, default=50, help="messages or commands in flight at once")
+    parser.add_argument("--messages", type=int, default=20000, help="chat messages for the listeners scenario")
+    parser.add_argument("--router", action="store_true", help="dispatch the listeners through MessageRouter")
+    parser.add_argument("--invocations", type=int, default=200, help="[p]whitelistadd runs for the whitelist scenario")
+    parser.add_argument("--names", type=int, default=5, help="usernames per [p]whitelistadd")
+    parser.add_argument("--pool-size", type=int, default=2, help="RCON connections in the pool")
+    parser.add_argument("--rcon-latency", type=float, default=0.001, help="seconds the stub RCON server takes per command")
+    parser.add_argument("--rcon-calls", type=int, default=200, help="RCON round trips in the micro scenario")
+    parser.add_argument("--requests", type=int, default=200, help="lookups, questions or checks for the HTTP scenarios")
+    parser.add_argument("--http-latency", type=float, default=0.005, help="seconds the stub HTTP APIs take per request")
+    parser.add_argument("--rules", type=int, default=5000, help="Kicker rules in the micro scenario")
+    parser.add_argument("--memory", action="store_true", help="trace allocations and report the peak (slows everything down)")
+    parser.add_argument("--baseline", help="JSON file from --save-baseline to compare against")
+    parser.add_argument("--save-baseline", help="write the results to this JSON file")
+    args = parser.parse_args(argv)
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario: {', '.join(sorted(unknown))}")
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    results = {}
+    for name in args.scenarios or SCENARIOS:
+        try:
+            results[name] = asyncio.run(run_scenario(name, args))
+        except Skipped as e:
+            print(f"{name}: skipped, {e}")
+            continue
+        report(name, results[name], baseline.get(name, {}))
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+from .diagnostics import Diagnostics
+
+
+async def setup(bot):
+    await bot.add_cog(Diagnostics(bot))
@@ -0,0 +1,287 @@
+from redbot.core import Config, checks, commands
+from redbot.core.utils.chat_formatting import box, pagify
+from collections import deque
+import asyncio
+import bisect
+import discord
+import io
+import logging
+import random
+import sys
+import threading
+import time
+import traceback
+
+log = logging.getLogger("red.diagnostics")
+
+# upper bounds in seconds, the last bucket catches everything above
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+
+class Histogram:
+    """Fixed-size latency histogram, cheap enough to update on every sample."""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket the percentile falls into."""
+        wanted = self.count * fraction
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= wanted:
+                return bound
+        return BUCKETS[-1]
+
+    def prometheus(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{name}_bucket{{{labels}{"," if labels else ""}le="{le}"}} {cumulative}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {self.total}")
+        lines.append(f"{name}_count{suffix} {self.count}")
+        return lines
+
+
+class Diagnostics(commands.Cog):
+    """Event loop lag watchdog and sampled timings for every command and listener.
+
+    A coroutine ticks a heartbeat; a watchdog thread notices when it stops and
+    grabs the event loop thread's stack while it is still blocked, which names
+    the blocking call. Listener timings come from wrapping ``bot._run_event``,
+    the one place discord.py awaits every dispatched listener, and from
+    MessageRouter's observer hook for the handlers it runs itself. Command
+    timings come from bot-wide before/after invoke hooks, which run in the
+    command's own task right around its callback.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.config = Config.get_conf(self, identifier=9071203344)
+        default_global = {
+            "sample_rate": 0.1,
+            "lag_threshold": 0.25,
+        }
+        self.config.register_global(**default_global)
+        self.sample_rate = default_global["sample_rate"]
+        self.lag_threshold = default_global["lag_threshold"]
+        self.tick_interval = 0.5
+
+        self.loop_lag = Histogram()
+        self.listener_timings = {}
+        self.command_timings = {}
+        self.command_starts = {}
+        self.stalls = deque(maxlen=10)
+
+        self.heartbeat = time.monotonic()
+        self.loop_thread_id = threading.get_ident()
+        self.stopped = threading.Event()
+        self.watchdog = None
+        self.monitor = None
+        self.original_run_event = None
+        self.chained_before_invoke = None
+        self.chained_after_invoke = None
+
+    async def cog_load(self):
+        self.sample_rate = await self.config.sample_rate()
+        self.lag_threshold = await self.config.lag_threshold()
+
+        self.loop_thread_id = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        self.monitor = asyncio.create_task(self.measure_lag())
+        self.watchdog = threading.Thread(target=self.watch, name="diagnostics-watchdog", daemon=True)
+        self.watchdog.start()
+
+        self.original_run_event = self.bot._run_event
+        self.bot._run_event = self.timed_run_event
+        self.attach_router(self.bot.get_cog("MessageRouter"))
+
+        # Red keeps a set of before_invoke hooks, discord.py a single one that
+        # is chained like the single after_invoke hook
+        if hasattr(self.bot, "remove_before_invoke_hook"):
+            self.bot.before_invoke(self.before_command)
+        else:
+            self.chained_before_invoke = getattr(self.bot, "_before_invoke", None)
+            self.bot._before_invoke = self.before_command
+        self.chained_after_invoke = getattr(self.bot, "_after_invoke", None)
+        self.bot._after_invoke = self.after_command
+
+    def cog_unload(self):
+        if self.original_run_event is not None:
+            self.bot._run_event = self.original_run_event
+        if hasattr(self.bot, "remove_before_invoke_hook"):
+            self.bot.remove_before_invoke_hook(self.before_command)
+        elif getattr(self.bot, "_before_invoke", None) == self.before_command:
+            self.bot._before_invoke = self.chained_before_invoke
+        if getattr(self.bot, "_after_invoke", None) == self.after_command:
+            self.bot._after_invoke = self.chained_after_invoke
+        router = self.bot.get_cog("MessageRouter")
+        if router is not None and router.observer == self.observe_routed:
+            router.observer = None
+        self.stopped.set()
+        if self.monitor is not None:
+            self.monitor.cancel()
+
+    async def measure_lag(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.tick_interval)
+            self.loop_lag.observe(max(0.0, loop.time() - start - self.tick_interval))
+            self.heartbeat = time.monotonic()
+
+    def watch(self):
+        # runs in its own thread, so it still works while the event loop is stuck
+        captured_for = None
+        while not self.stopped.wait(0.05):
+            heartbeat = self.heartbeat
+            stalled = time.monotonic() - heartbeat - self.tick_interval
+            if stalled < self.lag_threshold or captured_for == heartbeat:
+                continue
+            captured_for = heartbeat
+            frame = sys._current_frames().get(self.loop_thread_id)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame))
+            self.stalls.append((time.time(), stalled, stack))
+            log.warning("Event loop blocked for more than %.0f ms:\n%s", stalled * 1000, stack)
+
+    async def timed_run_event(self, coro, event_name, *args, **kwargs):
+        if random.random() >= self.sample_rate:
+            return await self.original_run_event(coro, event_name, *args, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            return await self.original_run_event(coro, event_name, *args, **kwargs)
+        finally:
+            owner = getattr(coro, "__self__", None)
+            cog_name = owner.qualified_name if isinstance(owner, commands.Cog) else "bot"
+            self.record_listener(cog_name, event_name, time.perf_counter() - start)
+
+    def observe_routed(self, cog_name, event_name, seconds):
+        # MessageRouter runs the handlers in their own tasks, past bot._run_event
+        if random.random() < self.sample_rate:
+            self.record_listener(cog_name, event_name, seconds)
+
+    def record_listener(self, cog_name, event_name, seconds):
+        key = (cog_name, event_name)
+        histogram = self.listener_timings.get(key)
+        if histogram is None:
+            histogram = self.listener_timings[key] = Histogram()
+        histogram.observe(seconds)
+
+    def attach_router(self, router):
+        if router is not None and hasattr(router, "observer"):
+            router.observer = self.observe_routed
+
+    @commands.Cog.listener()
+    async def on_cog_add(self, cog):
+        if cog.qualified_name == "MessageRouter":
+            self.attach_router(cog)
+
+    async def before_command(self, ctx):
+        if self.chained_before_invoke is not None:
+            await self.chained_before_invoke(ctx)
+        if random.random() < self.sample_rate:
+            self.command_starts[ctx] = time.perf_counter()
+
+    async def after_command(self, ctx):
+        # discord.py runs the after hooks in a finally block, so failed commands are timed too
+        self.finish_command(ctx)
+        if self.chained_after_invoke is not None:
+            await self.chained_after_invoke(ctx)
+
+    def finish_command(self, ctx):
+        start = self.command_starts.pop(ctx, None)
+        if start is None or ctx.command is None:
+            return
+        key = (ctx.cog.qualified_name if ctx.cog else "bot", ctx.command.qualified_name)
+        histogram = self.command_timings.get(key)
+        if histogram is None:
+            histogram = self.command_timings[key] = Histogram()
+        histogram.observe(time.perf_counter() - start)
+
+    def prometheus(self):
+        lines = ["# TYPE redbot_event_loop_lag_seconds histogram"]
+        lines += self.loop_lag.prometheus("redbot_event_loop_lag_seconds", "")
+        lines.append("# TYPE redbot_listener_seconds histogram")
+        for (cog, event), histogram in sorted(self.listener_timings.items()):
+            lines += histogram.prometheus("redbot_listener_seconds", f'cog="{cog}",event="{event}"')
+        lines.append("# TYPE redbot_command_seconds histogram")
+        for (cog, command), histogram in sorted(self.command_timings.items()):
+            lines += histogram.prometheus("redbot_command_seconds", f'cog="{cog}",command="{command}"')
+        lines.append("# TYPE redbot_event_loop_stalls gauge")
+        lines.append(f"redbot_event_loop_stalls {len(self.stalls)}")
+        return "\n".join(lines) + "\n"
+
+    @commands.group(invoke_without_command=True)
+    @checks.is_owner()
+    async def diagnostics(self, ctx: commands.Context):
+        """Show event loop lag and the slowest sampled listeners and commands"""
+        def row(name, histogram):
+            return (f"{name[:40]:<40} {histogram.count:>7} {histogram.total / histogram.count * 1000:>9.1f}"
+                    f" {histogram.percentile(0.95) * 1000:>9.1f}")
+
+        lines = [f"{'':<40} {'samples':>7} {'mean ms':>9} {'p95 ms':>9}"]
+        if self.loop_lag.count:
+            lines.append(row("event loop lag", self.loop_lag))
+        timings = [(f"{cog}.{event}", histogram) for (cog, event), histogram in self.listener_timings.items()]
+        timings += [(f"{cog} [p]{command}", histogram) for (cog, command), histogram in self.command_timings.items()]
+        timings.sort(key=lambda item: item[1].total / item[1].count, reverse=True)
+        lines += [row(name, histogram) for name, histogram in timings[:20]]
+        lines.append(f"\nstalls over {self.lag_threshold * 1000:.0f} ms: {len(self.stalls)}, sample rate {self.sample_rate}")
+        await ctx.send(box("\n".join(lines)))
+
+    @diagnostics.command(name="stalls")
+    async def diagnostics_stalls(self, ctx: commands.Context):
+        """Show the stacks captured while the event loop was blocked"""
+        if not self.stalls:
+            await ctx.send("No stalls recorded.")
+            return
+        text = "\n\n".join(
+            f"{time.strftime('%H:%M:%S', time.localtime(at))} blocked {stalled * 1000:.0f} ms\n{stack}"
+            for at, stalled, stack in self.stalls
+        )
+        for page in pagify(text, shorten_by=10):
+            await ctx.send(box(page, lang="py"))
+
+    @diagnostics.command(name="prometheus")
+    async def diagnostics_prometheus(self, ctx: commands.Context):
+        """Dump all histograms in Prometheus text format"""
+        await ctx.send(file=discord.File(io.BytesIO(self.prometheus().encode()), "metrics.prom"))
+
+    @diagnostics.command(name="samplerate")
+    async def diagnostics_samplerate(self, ctx: commands.Context, rate: float):
+        """Set the fraction of commands and listener calls that get timed (0-1)"""
+        self.sample_rate = max(0.0, min(rate, 1.0))
+        await self.config.sample_rate.set(self.sample_rate)
+        await ctx.tick()
+
+    @diagnostics.command(name="threshold")
+    async def diagnostics_threshold(self, ctx: commands.Context, milliseconds: int):
+        """Set how long the event loop may block before its stack is captured"""
+        self.lag_threshold = max(10, milliseconds) / 1000
+        await self.config.lag_threshold.set(self.lag_threshold)
+        await ctx.tick()
+
+    @diagnostics.command(name="reset")
+    async def diagnostics_reset(self, ctx: commands.Context):
+        """Clear all recorded timings and stalls"""
+        self.loop_lag = Histogram()
+        self.listener_timings.clear()
+        self.command_timings.clear()
+        self.stalls.clear()
+        await ctx.tick()
@@ -1,16 +1,21 @@
 import os
 import discord
 import asyncio
+import functools
 import subprocess
-import requests
-from redbot.core import commands
+from redbot.core import Config, checks, commands
+from redbot.core.data_manager import cog_data_path
+from discord.ext import tasks
 from discord.ui import View, Button
 from discord import app_commands
 import json
 import logging
 import random
 
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s %(levelname)s %(message)s')
+from .nfocache import NfoCache
+from .releaseindex import ReleaseIndex
+
+log = logging.getLogger("red.getnfo")
 
 
 class getnfo(commands.Cog):
@@ -31,6 +36,36 @@ class getnfo(commands.Cog):
         self.no_release_found_message_easter_egg = ("```Ey, was los? Kein Release gefunden, du Opfer! Wahrscheinlich "
                                                     "haste wieder irgendwas falsch gemacht, du Kiosk-König. Guck "
                                                     "nochmal richtig oder lass es einfach – Nuttööö!```")
+        self.release_index = ReleaseIndex(str(cog_data_path(self) / "releases.json"))
+        self.nfo_cache = NfoCache(str(cog_data_path(self) / "nfo_cache"))
+        self.config = Config.get_conf(self, identifier=2210199012)
+        default_global = {
+            "poll": False,
+            "prefetch_limit": 5,
+            "high_water": 0,
+        }
+        default_guild = {
+            "feed_groups": [],
+            "feed_categories": [],
+            "feed_channel": None,
+        }
+        self.config.register_global(**default_global)
+        self.config.register_guild(**default_guild)
+
+    async def cog_load(self):
+        self.release_index.load()
+        self.save_release_index.start()
+        if await self.config.poll():
+            self.poll_latest.start()
+
+    def cog_unload(self):
+        self.save_release_index.cancel()
+        self.poll_latest.cancel()
+        self.release_index.save()
+
+    @tasks.loop(minutes=5)
+    async def save_release_index(self):
+        self.release_index.save()
 
     @commands.command()
     async def sync_slash(self, ctx):
@@ -42,8 +77,18 @@ class getnfo(commands.Cog):
     async def nfo(self, ctx, *, release: str):
         await ctx.typing()
         api_responses = await self.fetch_responses(ctx, release)
+        if api_responses['srrdb']['success'] or api_responses['xrel']['success']:
+            self.release_index.add(release)
         await self.send_nfo(ctx, api_responses, release)
 
+    @nfo.autocomplete("release")
+    async def nfo_release_autocomplete(self, interaction: discord.Interaction, current: str):
+        # served from the local index only, autocomplete has to answer within 3 seconds
+        return [
+            app_commands.Choice(name=name[:100], value=name[:100])
+            for name in self.release_index.search(current)
+        ]
+
     async def fetch_responses(self, ctx, release):
         responses = {
             'srrdb': await self.fetch_srrdb_response(ctx, release),
@@ -52,6 +97,15 @@ class getnfo(commands.Cog):
         return responses
 
     async def fetch_srrdb_response(self, ctx, release):
+        import requests
+
+        cached = self.nfo_cache.get(release)
+        if cached and cached.get("srrdb_nfo"):
+            return {
+                'success': True,
+                'button': Button(label="View on srrDB", url=f"https://www.srrdb.com/release/details/{release}")
+            }
+
         url = f"{self.srrdb_api_base_url}{release}"
 
         response = requests.get(url)
@@ -70,6 +124,14 @@ class getnfo(commands.Cog):
         }
 
     async def fetch_xrel_response(self, ctx, release):
+        cached = self.nfo_cache.get(release)
+        if cached and cached.get("xrel"):
+            return {
+                'success': True,
+                'button': Button(label="View on xREL", url=cached["xrel"]["release_url"]),
+                'data': cached["xrel"]
+            }
+
         token = await self.get_token()
 
         if not token:
@@ -117,25 +179,35 @@ class getnfo(commands.Cog):
                 await ctx.send(self.no_release_found_message)
             return
 
-    async def send_xrel_nfo(self, ctx, api_responses, release):
-        data = api_responses['xrel']['data']
-        headers = {"Authorization": f"Bearer {await self.get_token()}"}
-        nfo_url = f"{self.xrel_api_base_url}/nfo/{data['nfo_type']}.json"
+    def download_xrel_nfo(self, token, nfo_type, release_id):
+        nfo_url = f"{self.xrel_api_base_url}/nfo/{nfo_type}.json"
 
         curl_command = [
             "curl", "-s",
-            "-H", f"Authorization: {headers['Authorization']}",
+            "-H", f"Authorization: Bearer {token}",
             "-G", nfo_url,
-            "--data-urlencode", f"id={data['release_info']['id']}"
+            "--data-urlencode", f"id={release_id}"
         ]
 
         log_command = ' '.join(curl_command)
-        logging.debug(f"Curl command: {log_command}")
+        log.debug("Curl command: %s", log_command)
 
         response = subprocess.run(curl_command, capture_output=True)
-        nfo_response_content = response.stdout
+        if response.returncode != 0:
+            return None
+        return response.stdout
+
+    async def send_xrel_nfo(self, ctx, api_responses, release):
+        data = api_responses['xrel']['data']
+        cached = self.nfo_cache.get(release)
+        if cached and cached.get("xrel_png"):
+            with open(cached["xrel_png"], "rb") as cached_file:
+                nfo_response_content = cached_file.read()
+        else:
+            nfo_response_content = self.download_xrel_nfo(await self.get_token(), data['nfo_type'],
+                                                           data['release_info']['id'])
 
-        if response.returncode == 0 and nfo_response_content:
+        if nfo_response_content:
             try:
                 view = View()
                 if api_responses['srrdb']['button']:
@@ -168,67 +240,84 @@ class getnfo(commands.Cog):
 
                 os.remove(file_path)
             except Exception as e:
-                logging.error(f"Failed to process NFO response: {e}")
+                log.error("Failed to process NFO response: %s", e)
                 await ctx.send("Failed to process NFO response.")
 
-    async def send_srrdb_nfo(self, ctx, api_responses, release):
-        url = f"https://api.srrdb.com/v1/nfo/{release}"
+    def render_srrdb_nfo(self, release, directory):
+        """Downloads the srrDB NFO and renders it with iNFEKT, returns the path without the .png suffix."""
+        import requests
+
+        url = f"{self.srrdb_api_base_url}{release}"
 
         response = requests.get(url)
 
-        if response.status_code == 200:
-            if response.json()['release'] is None:
-                return
+        if response.status_code != 200 or response.json()['release'] is None:
+            return None
 
-            nfo_response = requests.get(response.json()['nfolink'][0])
-            current_directory = os.path.dirname(os.path.abspath(__file__))
-            file_name = release
-            file_path = os.path.join(current_directory, file_name)
+        nfo_response = requests.get(response.json()['nfolink'][0])
+        current_directory = os.path.dirname(os.path.abspath(__file__))
+        file_path = os.path.join(directory, release)
 
-            with open(file_path + '.nfo', "wb") as file:
-                file.write(nfo_response.content)
+        with open(file_path + '.nfo', "wb") as file:
+            file.write(nfo_response.content)
 
-            infekt_exe = os.path.join(current_directory, "iNFEKT", "infekt-cli")
-            nfo_file_path = os.path.join(current_directory, f"{file_name}")
+        infekt_exe = os.path.join(current_directory, "iNFEKT", "infekt-cli")
 
-            flags_and_arguments = [
-                '--png', nfo_file_path + '.nfo',
-                '-W', '15',
-                '-H', '25',
-                '-R', '15',
-                '-G', '808080'
-            ]
+        flags_and_arguments = [
+            '--png', file_path + '.nfo',
+            '-W', '15',
+            '-H', '25',
+            '-R', '15',
+            '-G', '808080'
+        ]
 
-            try:
-                result = subprocess.run([infekt_exe] + flags_and_arguments, capture_output=True, text=True)
+        try:
+            result = subprocess.run([infekt_exe] + flags_and_arguments, capture_output=True, text=True)
 
-                print("Return code:", result.returncode)
-                print("Default output:", result.stdout)
-                print("Error output:", result.stderr)
-            except Exception as e:
-                print(f"Error occurred: {e}")
+            print("Return code:", result.returncode)
+            print("Default output:", result.stdout)
+            print("Error output:", result.stderr)
+        except Exception as e:
+            print(f"Error occurred: {e}")
 
-            view = View()
-            view.add_item(api_responses['srrdb']['button'])
-            comments = 0
-            if api_responses['xrel']['button']:
-                comments = await self.fetch_comments(release, api_responses['xrel']['data'])
-                view.add_item(api_responses['xrel']['button'])
+        os.remove(file_path + '.nfo')
+        return file_path
 
-            await self.send_embed_with_image(ctx,
-                                             file_path,
-                                             file_name,
-                                             view,
-                                             source="[srrDB](https://www.srrdb.com/)",
-                                             release_type="Scene",
-                                             color=discord.Color.from_rgb(244, 67, 54),
-                                             comments=comments
-                                             )
+    async def send_srrdb_nfo(self, ctx, api_responses, release):
+        cached = self.nfo_cache.get(release)
+        if cached and cached.get("srrdb_nfo"):
+            file_path = cached["srrdb_nfo"]
+        else:
+            file_path = self.render_srrdb_nfo(release, os.path.dirname(os.path.abspath(__file__)))
+            if file_path is None:
+                return
 
-            os.remove(nfo_file_path + '.nfo')
-            os.remove(nfo_file_path + '.png')
+        view = View()
+        view.add_item(api_responses['srrdb']['button'])
+        comments = 0
+        if api_responses['xrel']['button']:
+            comments = await self.fetch_comments(release, api_responses['xrel']['data'])
+            view.add_item(api_responses['xrel']['button'])
+
+        await self.send_embed_with_image(ctx,
+                                         file_path,
+                                         release,
+                                         view,
+                                         source="[srrDB](https://www.srrdb.com/)",
+                                         release_type="Scene",
+                                         color=discord.Color.from_rgb(244, 67, 54),
+                                         comments=comments
+                                         )
+
+        if not cached or not cached.get("srrdb_nfo"):
+            os.remove(file_path + '.png')
 
     async def fetch_comments(self, release, data):
+        import requests
+
+        if data.get('prefetched') and 'comments' in data['release_info']:
+            return f"[{data['release_info']['comments']}]({data['release_url']})"
+
         params = {
             "dirname": {release}
         }
@@ -263,6 +352,144 @@ class getnfo(commands.Cog):
                 view=view,
             )
 
+    # xREL latest release poller, prefetches NFOs so the first !nfo is served from cache
+    def fetch_latest_releases(self, token):
+        curl_command = ["curl", "-s", "-H", f"Authorization: Bearer {token}", "-G",
+                        f"{self.xrel_api_base_url}/release/latest.json", "--data-urlencode", "per_page=100"]
+        response = subprocess.run(curl_command, capture_output=True)
+        if response.returncode != 0:
+            return []
+        try:
+            return json.loads(response.stdout.decode('utf-8')).get("list", [])
+        except json.JSONDecodeError:
+            return []
+
+    def release_matches(self, release_info, settings):
+        if not settings["feed_groups"] and not settings["feed_categories"]:
+            return False
+        group = (release_info.get("group_name") or "").lower()
+        category = (release_info.get("ext_info") or {}).get("type", "").lower()
+        if settings["feed_groups"] and group not in settings["feed_groups"]:
+            return False
+        return not settings["feed_categories"] or category in settings["feed_categories"]
+
+    async def prefetch_release(self, token, release_info):
+        release = release_info["dirname"]
+        loop = asyncio.get_running_loop()
+        entry = {}
+
+        if "ext_info" in release_info and "link_href" in release_info["ext_info"]:
+            entry["xrel"] = {
+                'release_url': release_info["link_href"],
+                'release_info': release_info,
+                'nfo_type': "release",
+                'prefetched': True,
+            }
+            nfo = await loop.run_in_executor(None, self.download_xrel_nfo, token, "release", release_info["id"])
+            if nfo and nfo.startswith(b"\x89PNG"):
+                entry["xrel_png"] = self.nfo_cache.file_path(release) + ".xrel.png"
+                with open(entry["xrel_png"], "wb") as file:
+                    file.write(nfo)
+
+        file_path = await loop.run_in_executor(
+            None, functools.partial(self.render_srrdb_nfo, release, self.nfo_cache.path)
+        )
+        if file_path and os.path.exists(file_path + ".png"):
+            entry["srrdb_nfo"] = file_path
+
+        if entry:
+            self.nfo_cache.put(release, entry)
+
+    async def poll_once(self):
+        token = await self.get_token()
+        if not token:
+            return
+
+        releases = await asyncio.get_running_loop().run_in_executor(None, self.fetch_latest_releases, token)
+        high_water = await self.config.high_water()
+        new_releases = sorted((r for r in releases if r.get("time", 0) > high_water), key=lambda r: r["time"])
+        if not new_releases:
+            return
+        await self.config.high_water.set(new_releases[-1]["time"])
+
+        for release_info in new_releases:
+            self.release_index.add(release_info["dirname"])
+
+        # first run only records the high-water mark instead of flooding the feeds
+        if high_water == 0:
+            return
+
+        guilds = await self.config.all_guilds()
+        budget = await self.config.prefetch_limit()
+        for release_info in new_releases:
+            matching = [guild_id for guild_id, settings in guilds.items() if self.release_matches(release_info, settings)]
+            if not matching:
+                continue
+
+            if budget > 0:
+                budget -= 1
+                await self.prefetch_release(token, release_info)
+
+            for guild_id in matching:
+                channel = self.bot.get_channel(guilds[guild_id]["feed_channel"] or 0)
+                if channel:
+                    await channel.send(f"**{release_info['dirname']}** <{release_info.get('link_href', '')}>")
+
+    @tasks.loop(minutes=10)
+    async def poll_latest(self):
+        try:
+            await self.poll_once()
+        except Exception as e:
+            log.error("xREL poll failed: %s", e)
+
+    @poll_latest.before_loop
+    async def before_poll_latest(self):
+        await self.bot.wait_until_ready()
+
+    @commands.group()
+    @commands.guild_only()
+    async def nfofeed(self, ctx):
+        """Prefetch and announce new xREL releases"""
+
+    @nfofeed.command(name="poll")
+    @checks.is_owner()
+    async def nfofeed_poll(self, ctx, enabled: bool):
+        """Turn the xREL poller on or off"""
+        await self.config.poll.set(enabled)
+        if enabled and not self.poll_latest.is_running():
+            self.poll_latest.start()
+        elif not enabled:
+            self.poll_latest.cancel()
+        await ctx.tick()
+
+    @nfofeed.command(name="budget")
+    @checks.is_owner()
+    async def nfofeed_budget(self, ctx, releases: int):
+        """Set how many releases are prefetched per poll"""
+        await self.config.prefetch_limit.set(max(0, releases))
+        await ctx.tick()
+
+    @nfofeed.command(name="groups")
+    @checks.admin_or_permissions(manage_guild=True)
+    async def nfofeed_groups(self, ctx, *groups: str):
+        """Set the release groups to prefetch, none to clear"""
+        await self.config.guild(ctx.guild).feed_groups.set([group.lower() for group in groups])
+        await ctx.tick()
+
+    @nfofeed.command(name="categories")
+    @checks.admin_or_permissions(manage_guild=True)
+    async def nfofeed_categories(self, ctx, *categories: str):
+        """Set the xREL categories (movie, tv, game, ...) to prefetch, none to clear"""
+        await self.config.guild(ctx.guild).feed_categories.set([category.lower() for category in categories])
+        await ctx.tick()
+
+    @nfofeed.command(name="channel")
+    @checks.admin_or_permissions(manage_guild=True)
+    async def nfofeed_channel(self, ctx, channel: discord.TextChannel = None):
+        """Set the channel new releases are announced in, none to stop announcing"""
+        await self.config.guild(ctx.guild).feed_channel.set(channel.id if channel else None)
+        await ctx.tick()
+
     # XRel token oauth zeugs
     def load_credentials(self):
         script_dir = os.path.dirname(__file__)
@@ -283,7 +510,7 @@ class getnfo(commands.Cog):
     async def get_token(self):
         """Fetches or reuses the OAuth2 token using Client Credentials Grant with curl."""
         current_time = asyncio.get_event_loop().time()
-        logging.debug(f"Current time: {current_time}")
+        log.debug("Current time: %s", current_time)
         if not self.token or current_time >= self.token_expires_at:
             curl_command = [
                 "curl",
@@ -296,24 +523,24 @@ class getnfo(commands.Cog):
 
             try:
                 result = subprocess.run(curl_command, capture_output=True, text=True)
-                logging.debug(f"Curl stdout: {result.stdout}")
-                logging.debug(f"Curl stderr: {result.stderr}")
+                log.debug("Curl stdout: %s", result.stdout)
+                log.debug("Curl stderr: %s", result.stderr)
 
                 if result.returncode == 0:
                     token_data = json.loads(result.stdout)
                     self.token = token_data.get("access_token")
                     expires_in = token_data.get("expires_in", 3600)
                     self.token_expires_at = current_time + expires_in - 60  # Refresh 1 minute before expiration
-                    logging.debug(f"Token: {self.token}")
-                    logging.debug(f"Token expires at: {self.token_expires_at}")
+                    log.debug("Token: %s", self.token)
+                    log.debug("Token expires at: %s", self.token_expires_at)
                     if not self.token or self.token.count(".") != 2:
-                        logging.error("Invalid token format: %s", self.token)
+                        log.error("Invalid token format: %s", self.token)
                         self.token = None  # Reset token if invalid
                 else:
-                    logging.error(f"Failed to retrieve token: {result.stderr}")
+                    log.error("Failed to retrieve token: %s", result.stderr)
                     self.token = None
             except Exception as e:
-                logging.error(f"Error occurred during curl command: {e}")
+                log.error("Error occurred during curl command: %s", e)
                 self.token = None
         return self.token
 
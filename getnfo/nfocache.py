@@ -0,0 +1,39 @@
+import os
+import re
+from collections import OrderedDict
+
+
+class NfoCache:
+    """Prefetched xREL/srrDB results and rendered NFO images, keyed by release dirname.
+
+    Only hits are cached; a release missing on srrDB or xREL may still show up
+    there later. The oldest entries and their files are dropped past max_entries.
+    """
+
+    def __init__(self, path, max_entries=200):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        os.makedirs(path, exist_ok=True)
+        for file_name in os.listdir(path):
+            os.remove(os.path.join(path, file_name))
+
+    def file_path(self, release):
+        return os.path.join(self.path, re.sub(r"[^\w.\-]", "_", release))
+
+    def get(self, release):
+        entry = self.entries.get(release.lower())
+        if entry is not None:
+            self.entries.move_to_end(release.lower())
+        return entry
+
+    def put(self, release, entry):
+        self.entries[release.lower()] = entry
+        self.entries.move_to_end(release.lower())
+        while len(self.entries) > self.max_entries:
+            _, old = self.entries.popitem(last=False)
+            for key in ("xrel_png", "srrdb_nfo"):
+                if old.get(key):
+                    path = old[key] if key == "xrel_png" else old[key] + ".png"
+                    if os.path.exists(path):
+                        os.remove(path)
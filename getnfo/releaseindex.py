@@ -0,0 +1,59 @@
+import bisect
+import heapq
+import json
+import os
+import time
+
+
+class ReleaseIndex:
+    """Release dirnames kept as a sorted list of lowercase keys for bisect prefix lookups."""
+
+    def __init__(self, path, max_size=20000):
+        self.path = path
+        self.max_size = max_size
+        self.keys = []
+        self.names = {}  # lowercase key -> (dirname, last seen)
+        self.dirty = False
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r") as file:
+            entries = json.load(file)
+        self.names = {name.lower(): (name, seen) for name, seen in entries}
+        self.keys = sorted(self.names)
+
+    def save(self):
+        if not self.dirty:
+            return
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(list(self.names.values()), file)
+        os.replace(temp_path, self.path)
+        self.dirty = False
+
+    def add(self, name):
+        key = name.lower()
+        if key not in self.names:
+            bisect.insort(self.keys, key)
+        self.names[key] = (name, time.time())
+        self.dirty = True
+
+        if len(self.keys) > self.max_size:
+            oldest = heapq.nsmallest(len(self.keys) - self.max_size * 9 // 10, self.names, key=lambda k: self.names[k][1])
+            for key in oldest:
+                del self.names[key]
+            self.keys = sorted(self.names)
+
+    def search(self, prefix, limit=25):
+        if not prefix:
+            return [name for name, _ in heapq.nlargest(limit, self.names.values(), key=lambda entry: entry[1])]
+
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self.keys, prefix)
+        results = []
+        for key in self.keys[start:start + limit]:
+            if not key.startswith(prefix):
+                break
+            results.append(self.names[key][0])
+        return results
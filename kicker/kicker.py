@@ -1,36 +1,376 @@
-from redbot.core import commands
-from mcrcon import MCRcon
-from dotenv import load_dotenv
-import os
+from redbot.core import Config, checks, commands
+import asyncio
+import discord
+import re
+import time
 
-load_dotenv()
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+ACTIONS = ("kick", "warn", "tempban", "log")
+MATCHERS = ("literal", "regex", "words")
+
+# bridge messages look like "username: message"
+BRIDGE_PATTERN = re.compile(r"^([^:\n]+):\s*(.*)$", re.DOTALL)
+MINECRAFT_NAME = re.compile(r"^[A-Za-z0-9_]{3,16}$")
+# rules that can't be wrapped in the combined pattern: numbered backreferences
+# shift, group names can clash between rules and global inline flags such as
+# (?i) are only allowed at the very start of a pattern
+STANDALONE_PATTERN = re.compile(r"\\[1-9]|\(\?P[<=]|\(\?\(|\(\?[aiLmsux]+\)")
+
+
+def alternation(needles):
+    """One regex for all needles, factored into a trie of their shared prefixes.
+
+    re tries every branch of a plain alternation at every position; in a trie
+    only the branch for the next character can match, whatever the number of
+    needles. Each continuation is optional and greedy, so the longest needle wins.
+    """
+    trie = {}
+    for needle in needles:
+        node = trie
+        for char in needle:
+            node = node.setdefault(char, {})
+        node[""] = None
+    return trie_pattern(trie)
+
+
+def trie_pattern(node):
+    branches = [re.escape(char) + trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    if len(branches) == 1 and "" not in node:
+        return branches[0]
+    return f"(?:{'|'.join(branches)})" + ("?" if "" in node else "")
+
+
+def required_needles(items):
+    """Substrings of which one must occur in every match of a parsed pattern.
+
+    Returns the most selective set found (the longest literal run, or one
+    needle per branch of an alternation), or None if the pattern has none.
+    """
+    best = None
+
+    def consider(needles):
+        nonlocal best
+        if needles and all(needles) and (best is None or min(map(len, needles)) > min(map(len, best))):
+            best = needles
+
+    run = []
+    for op, av in [*items, (None, None)]:
+        if op is sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+        if run:
+            consider({"".join(run).lower()})
+            run = []
+        if op is sre_parse.SUBPATTERN:
+            consider(required_needles(av[-1]))
+        elif op is sre_parse.BRANCH:
+            branches = [required_needles(branch) for branch in av[1]]
+            if all(branches):
+                consider(set().union(*branches))
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            consider(required_needles(av[2]))
+    return best
+
+
+class RuleSet:
+    """All rules of one channel, matched in a single pass over the message.
+
+    Literals and word lists share one group each in a combined pattern and are
+    mapped back to their rule through a dict, so thousands of them don't turn
+    into thousands of groups. Regex rules are compiled on their own, and a trie
+    of the substrings each one requires picks the few worth running; only regex
+    rules without such a substring are tried on every message.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.order = {id(rule): index for index, rule in enumerate(rules)}
+        self.literals = {}
+        self.words = {}
+        self.regexes = []
+        self.separate = []
+        self.unfiltered = []
+        needles = {}
+        for rule in rules:
+            if rule["matcher"] == "literal":
+                self.literals.setdefault(rule["pattern"].lower(), rule)
+            elif rule["matcher"] == "words":
+                for word in re.split(r"[\s,]+", rule["pattern"]):
+                    if word:
+                        self.words.setdefault(word.lower(), rule)
+            else:
+                compiled = re.compile(rule["pattern"], re.IGNORECASE)
+                required = required_needles(sre_parse.parse(rule["pattern"], re.IGNORECASE))
+                if required is None and not STANDALONE_PATTERN.search(rule["pattern"]):
+                    self.regexes.append(rule)
+                    continue
+                index = len(self.separate)
+                self.separate.append((compiled, rule))
+                if required is None:
+                    self.unfiltered.append(index)
+                for needle in required or ():
+                    needles.setdefault(needle, set()).add(index)
+
+        # a hit on a needle also means every needle that is a prefix of it occurs there
+        self.needle_rules = {}
+        for needle, indexes in needles.items():
+            self.needle_rules[needle] = set(indexes).union(
+                *(needles.get(needle[:end], ()) for end in range(1, len(needle)))
+            )
+        self.prefilter = re.compile(f"(?=({alternation(needles)}))", re.IGNORECASE) if needles else None
+
+        parts = []
+        if self.literals:
+            parts.append(f"(?P<literal>{alternation(self.literals)})")
+        if self.words:
+            parts.append(rf"\b(?P<word>{alternation(self.words)})\b")
+        parts.extend(f"(?P<r{index}>{rule['pattern']})" for index, rule in enumerate(self.regexes))
+        self.pattern = re.compile("|".join(parts), re.IGNORECASE) if parts else None
+
+    def match(self, text):
+        best = None
+        if self.pattern is not None:
+            found = self.pattern.search(text)
+            if found is not None:
+                if found.lastgroup == "literal":
+                    rule = self.literals[found.group("literal").lower()]
+                elif found.lastgroup == "word":
+                    rule = self.words[found.group("word").lower()]
+                else:
+                    rule = self.regexes[int(found.lastgroup[1:])]
+                best = (found.start(), self.order[id(rule)], rule)
+
+        candidates = set(self.unfiltered)
+        if self.prefilter is not None:
+            everything = range(len(self.separate))
+            for found in self.prefilter.finditer(text):
+                # case folding can make the hit differ from the stored needle, then just run them all
+                candidates |= self.needle_rules.get(found.group(1).lower(), everything)
+
+        for index in candidates:
+            pattern, rule = self.separate[index]
+            found = pattern.search(text)
+            if found is not None:
+                candidate = (found.start(), self.order[id(rule)], rule)
+                if best is None or candidate[:2] < best[:2]:
+                    best = candidate
+        return best[2] if best else None
 
 
 class Kicker(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.config = Config.get_conf(self, identifier=793150452430274601)
+        default_global = {
+            "log_channel": 707383988200800358,
+            "reason": "wir bleiben hier mal christlich",
+            "cooldown": 30,
+            "tempban_minutes": 60,
+            "tempbans": {},
+            "seeded": False,
+        }
+        self.config.register_global(**default_global)
+        self.config.register_channel(rules=[])
+        self.rulesets = {}
+        self.cooldowns = {}
+        self.pardons = {}
+        self.settings = {}
+
+    async def cog_load(self):
+        if not await self.config.seeded():
+            await self.config.channel_from_id(793150452430274601).rules.set(
+                [{"matcher": "literal", "pattern": "sex", "action": "kick"}]
+            )
+            await self.config.seeded.set(True)
+
+        self.settings = await self.config.all()
+        for channel_id, data in (await self.config.all_channels()).items():
+            if data["rules"]:
+                self.rulesets[channel_id] = RuleSet(data["rules"])
+
+        for username, until in self.settings["tempbans"].items():
+            self.schedule_pardon(username, until)
+
+    async def cog_unload(self):
+        if router := self.bot.get_cog("MessageRouter"):
+            router.unregister(self)
+        for task in self.pardons.values():
+            task.cancel()
+
+    def message_route(self):
+        return {"channels": set(self.rulesets)}
+
+    def update_route(self):
+        if router := self.bot.get_cog("MessageRouter"):
+            router.register(self)
 
     @commands.Cog.listener()
     async def on_message(self, message):
-        channel = self.bot.get_channel(707383988200800358)
-        if message.author == self.bot.user:
+        ruleset = self.rulesets.get(message.channel.id)
+        if ruleset is None or message.author == self.bot.user:
+            return
+
+        parsed = BRIDGE_PATTERN.match(message.content)
+        if parsed is None:
             return
 
-        needle = "sex"
+        username, text = parsed.group(1).strip(" *_`<>"), parsed.group(2)
+        rule = ruleset.match(text)
+        if rule is None:
+            return
+
+        now = time.monotonic()
+        key = (message.channel.id, username.lower())
+        if self.cooldowns.get(key, 0) > now:
+            return
+        if len(self.cooldowns) > 10000:
+            self.cooldowns = {k: until for k, until in self.cooldowns.items() if until > now}
+        self.cooldowns[key] = now + self.settings["cooldown"]
+
+        await self.apply(rule, username, text)
+
+    async def apply(self, rule, username, text):
+        action = rule["action"]
+        log_channel = self.bot.get_channel(self.settings["log_channel"])
+
+        if action == "log" or not MINECRAFT_NAME.match(username):
+            if log_channel:
+                await log_channel.send(f"[{action}] {username}: {text}", allowed_mentions=discord.AllowedMentions.none())
+            return
+
+        rcon = self.bot.get_cog("RconCog")
+        if rcon is None:
+            print("RconCog ist nicht geladen")
+            return
+
+        reason = self.settings["reason"]
+        try:
+            if action == "kick":
+                response = await rcon.rcon.command(f"kick {username} {reason}")
+            elif action == "warn":
+                response = await rcon.rcon.command(f"tell {username} {reason}")
+            else:
+                response = await rcon.rcon.command(f"ban {username} {reason}")
+                until = time.time() + self.settings["tempban_minutes"] * 60
+                async with self.config.tempbans() as tempbans:
+                    tempbans[username] = until
+                self.settings["tempbans"][username] = until
+                self.schedule_pardon(username, until)
+        except Exception as e:
+            print(e)
+            return
+
+        if log_channel and response:
+            await log_channel.send(response, allowed_mentions=discord.AllowedMentions.none())
+
+    def schedule_pardon(self, username, until):
+        if username in self.pardons:
+            self.pardons[username].cancel()
+        self.pardons[username] = asyncio.create_task(self.pardon_later(username, until))
+
+    async def pardon_later(self, username, until):
+        await asyncio.sleep(max(0, until - time.time()))
+        rcon = self.bot.get_cog("RconCog")
+        if rcon is None:
+            print(f"RconCog ist nicht geladen, {username} bleibt gebannt")
+            return
+        try:
+            await rcon.rcon.command(f"pardon {username}")
+        except Exception as e:
+            print(e)
+            return
+        async with self.config.tempbans() as tempbans:
+            tempbans.pop(username, None)
+        self.settings["tempbans"].pop(username, None)
+        self.pardons.pop(username, None)
+
+    async def save_rules(self, channel_id, rules):
+        await self.config.channel_from_id(channel_id).rules.set(rules)
+        if rules:
+            self.rulesets[channel_id] = RuleSet(rules)
+        else:
+            self.rulesets.pop(channel_id, None)
+        self.update_route()
+
+    @commands.group()
+    @checks.is_owner()
+    async def kicker(self, ctx: commands.Context):
+        """Moderation rules for Minecraft bridge channels"""
+        # owner only: rules and settings act on the one Minecraft server, whichever guild they're set from
+
+    @kicker.command(name="addrule")
+    async def kicker_addrule(self, ctx: commands.Context, channel: discord.TextChannel, action: str, matcher: str, *, pattern: str):
+        """Add a rule, e.g. `[p]kicker addrule #bridge kick words foo bar`
+
+        Actions: kick, warn, tempban, log. Matchers: literal, regex, words.
+        """
+        action, matcher = action.lower(), matcher.lower()
+        if action not in ACTIONS or matcher not in MATCHERS:
+            await ctx.send(f"Action must be one of {', '.join(ACTIONS)}, matcher one of {', '.join(MATCHERS)}.")
+            return
+
+        rule = {"matcher": matcher, "pattern": pattern, "action": action}
+        rules = list(self.rulesets[channel.id].rules) if channel.id in self.rulesets else []
+        try:
+            RuleSet(rules + [rule])
+        except re.error as e:
+            await ctx.send(f"Invalid pattern: {e}")
+            return
+
+        await self.save_rules(channel.id, rules + [rule])
+        await ctx.tick()
+
+    @kicker.command(name="delrule")
+    async def kicker_delrule(self, ctx: commands.Context, channel: discord.TextChannel, index: int):
+        """Delete a rule by its number from `[p]kicker rules`"""
+        rules = list(self.rulesets[channel.id].rules) if channel.id in self.rulesets else []
+        if not 1 <= index <= len(rules):
+            await ctx.send("No rule with that number.")
+            return
+        del rules[index - 1]
+        await self.save_rules(channel.id, rules)
+        await ctx.tick()
+
+    @kicker.command(name="rules")
+    async def kicker_rules(self, ctx: commands.Context, channel: discord.TextChannel):
+        """List the rules of a channel"""
+        rules = self.rulesets[channel.id].rules if channel.id in self.rulesets else []
+        lines = [f"{index}. {rule['action']} on {rule['matcher']} `{rule['pattern']}`" for index, rule in enumerate(rules, 1)]
+        await ctx.send("\n".join(lines) or "No rules set.")
+
+    @kicker.command(name="reason")
+    async def kicker_reason(self, ctx: commands.Context, *, reason: str):
+        """Set the reason sent with kicks, warnings and bans"""
+        await self.config.reason.set(reason)
+        self.settings["reason"] = reason
+        await ctx.tick()
+
+    @kicker.command(name="cooldown")
+    async def kicker_cooldown(self, ctx: commands.Context, seconds: int):
+        """Set how long a user is ignored after a rule fired"""
+        await self.config.cooldown.set(seconds)
+        self.settings["cooldown"] = seconds
+        await ctx.tick()
 
-        if message.channel.id == 793150452430274601:
-            if needle in message.content:
-                if ":" in message.content:
-                    username = message.content.split(":", 1)[0]
-                    self.saved_start = username
-                    print(f"Gespeicherter Anfang: {self.saved_start}")
+    @kicker.command(name="tempban")
+    async def kicker_tempban(self, ctx: commands.Context, minutes: int):
+        """Set the length of tempbans"""
+        await self.config.tempban_minutes.set(minutes)
+        self.settings["tempban_minutes"] = minutes
+        await ctx.tick()
 
-                    try:
-                        with MCRcon("192.168.178.167", os.getenv("SERVER_PASSWORD"), port=25575) as mcr:
-                            response = mcr.command(f"kick {username} wir bleiben hier mal christlich")
-                            await channel.send(response)
-                    except Exception as e:
-                        print(e)
+    @kicker.command(name="logchannel")
+    async def kicker_logchannel(self, ctx: commands.Context, channel: discord.TextChannel):
+        """Set the channel RCON responses and log-only hits are posted to"""
+        await self.config.log_channel.set(channel.id)
+        self.settings["log_channel"] = channel.id
+        await ctx.tick()
 
 
 def setup(bot):
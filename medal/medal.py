@@ -1,25 +1,324 @@
-from redbot.core import commands
+from redbot.core import Config, checks, commands
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import asyncio
+import copy
 import discord
+import re
+
+FIELDS = ("channels", "users", "roles", "domains", "patterns")
+
+URL_PATTERN = re.compile(r"https?://[^\s<>()\[\]]+", re.IGNORECASE)
+TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "si", "ref", "ref_src", "feature", "mc_cid", "mc_eid"}
+# patterns that can't share a regex with others: numbered backreferences shift,
+# group names can clash and global inline flags such as (?i) must come first
+STANDALONE_PATTERN = re.compile(r"\\[1-9]|\(\?P[<=]|\(\?\(|\(\?[aiLmsux]+\)")
+
+DEFAULT_RULES = {
+    "medal": {
+        "channels": [1349869798103842866],
+        "users": [307998818547531777],
+        "roles": [],
+        "domains": [],
+        "patterns": [re.escape("[Medal.tv](https://medal.tv/?utm_source=discord&utm_content=share_message)")],
+    }
+}
+
+
+def normalize_domain(domain):
+    domain = domain.lower().strip().rstrip(".")
+    domain = domain.split("://", 1)[-1].split("/", 1)[0].split(":", 1)[0]
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+def parse_value(field, value):
+    """Turns a command argument into the form stored in a rule's field, raises ValueError if it doesn't fit."""
+    if field in ("channels", "users", "roles"):
+        found = re.search(r"\d+", value)
+        if found is None:
+            raise ValueError("Expected a mention or an ID.")
+        return int(found.group())
+    if field == "domains":
+        return normalize_domain(value)
+    try:
+        re.compile(value)
+    except re.error as e:
+        raise ValueError(f"Invalid pattern: {e}")
+    return value
+
+
+def normalize_url(url):
+    """Lowercases the host, drops www. and strips tracking parameters."""
+    parts = urlsplit(url)
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    ]
+    path = parts.path.rstrip("/")
+    return normalize_domain(parts.netloc) + path + ("?" + urlencode(query) if query else "")
+
+
+class DomainTrie:
+    """Domains stored label by label from the TLD down, so subdomains match too."""
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, domain, value):
+        node = self.root
+        for label in reversed(domain.split(".")):
+            node = node.setdefault(label, {})
+        node.setdefault(None, set()).add(value)
+
+    def lookup(self, domain):
+        found = set()
+        node = self.root
+        for label in reversed(domain.split(".")):
+            node = node.get(label)
+            if node is None:
+                break
+            found |= node.get(None, set())
+        return found
+
+
+def compile_patterns(patterns):
+    """The patterns as few regexes as possible, any of which matching means a hit."""
+    shared = [pattern for pattern in patterns if not STANDALONE_PATTERN.search(pattern)]
+    compiled = [re.compile(pattern, re.IGNORECASE) for pattern in patterns if STANDALONE_PATTERN.search(pattern)]
+    if shared:
+        compiled.append(re.compile("|".join(f"(?:{pattern})" for pattern in shared), re.IGNORECASE))
+    return compiled
+
+
+class RuleBucket:
+    """The rules that apply to one channel, compiled together.
+
+    The patterns of rules open to anyone share one regex, since any hit there
+    deletes the message. Rules limited to some users or roles keep their own,
+    so a rule that doesn't apply to the author can never hide one that does.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.domains = DomainTrie()
+        for index, rule in enumerate(rules):
+            for domain in rule["domains"]:
+                self.domains.add(domain, index)
+        self.has_domains = any(rule["domains"] for rule in rules)
+        self.open = {index for index, rule in enumerate(rules) if not rule["users"] and not rule["roles"]}
+        self.open_patterns = compile_patterns([pattern for index in sorted(self.open) for pattern in rules[index]["patterns"]])
+        self.restricted = {
+            index: compile_patterns(rule["patterns"])
+            for index, rule in enumerate(rules) if index not in self.open
+        }
+
+    def applies_to(self, rule, author):
+        if author.id in rule["users"]:
+            return True
+        return any(role.id in rule["roles"] for role in getattr(author, "roles", ()))
+
+    def matches(self, message):
+        author = message.author
+        restricted = [index for index in self.restricted if self.applies_to(self.rules[index], author)]
+        if not self.open and not restricted:
+            return False
+
+        content = message.content
+        urls = [normalize_url(url) for url in URL_PATTERN.findall(content)]
+
+        if self.has_domains:
+            candidates = self.open.union(restricted)
+            for url in urls:
+                if self.domains.lookup(url.split("/", 1)[0].split("?", 1)[0]) & candidates:
+                    return True
+
+        text = "\n".join([content] + urls)
+        patterns = self.open_patterns + [pattern for index in restricted for pattern in self.restricted[index]]
+        return any(pattern.search(text) for pattern in patterns)
+
+
+class GuildFilter:
+    def __init__(self, rules):
+        rules = [
+            {
+                "channels": set(rule["channels"]),
+                "users": set(rule["users"]),
+                "roles": set(rule["roles"]),
+                "domains": rule["domains"],
+                "patterns": rule["patterns"],
+            }
+            for rule in rules.values()
+        ]
+        anywhere = [rule for rule in rules if not rule["channels"]]
+        channel_ids = {channel_id for rule in rules for channel_id in rule["channels"]}
+        self.by_channel = {
+            channel_id: RuleBucket([rule for rule in rules if channel_id in rule["channels"]] + anywhere)
+            for channel_id in channel_ids
+        }
+        self.anywhere = RuleBucket(anywhere) if anywhere else None
+        self.channels = None if anywhere else channel_ids
 
 
 class Medal(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.target_user_id = 307998818547531777
-        self.target_channel_id = 1349869798103842866
-        self.banned_url = "[Medal.tv](https://medal.tv/?utm_source=discord&utm_content=share_message)"
+        self.config = Config.get_conf(self, identifier=1349869798103842866)
+        # not a dict default: Config would merge its keys back into every read,
+        # so the default rule could never be removed
+        self.config.register_guild(rules=None)
+        self.default_filter = GuildFilter(DEFAULT_RULES)
+        self.filters = {}
+        self.pending_deletes = {}
+        self.flush_tasks = set()
+
+    async def cog_load(self):
+        for guild_id, data in (await self.config.all_guilds()).items():
+            if data["rules"] is not None:
+                self.filters[guild_id] = GuildFilter(data["rules"])
+
+    async def get_rules(self, guild):
+        rules = await self.config.guild(guild).rules()
+        return copy.deepcopy(DEFAULT_RULES) if rules is None else rules
+
+    def message_route(self):
+        channels = set()
+        for guild_filter in [self.default_filter, *self.filters.values()]:
+            if guild_filter.channels is None:
+                return {"channels": None}
+            channels |= guild_filter.channels
+        return {"channels": channels}
+
+    def update_route(self):
+        if router := self.bot.get_cog("MessageRouter"):
+            router.register(self)
+
+    async def cog_unload(self):
+        if router := self.bot.get_cog("MessageRouter"):
+            router.unregister(self)
 
     @commands.Cog.listener()
     async def on_message(self, message):
-        if message.author.id == self.target_user_id and message.channel.id == self.target_channel_id:
-            if self.banned_url in message.content:
-                try:
-                    await message.delete()
-                except discord.Forbidden:
-                    print("Fehlende Berechtigungen zum Löschen von Nachrichten")
-                except discord.NotFound:
-                    print("Nachricht wurde bereits gelöscht")
+        if message.guild is None:
+            return
+
+        guild_filter = self.filters.get(message.guild.id, self.default_filter)
+        bucket = guild_filter.by_channel.get(message.channel.id, guild_filter.anywhere)
+        if bucket is None or not bucket.matches(message):
+            return
+
+        self.queue_delete(message)
+
+    def queue_delete(self, message):
+        # collect a burst of hits per channel and remove them with one bulk delete
+        pending = self.pending_deletes.get(message.channel.id)
+        if pending is None:
+            pending = self.pending_deletes[message.channel.id] = []
+            task = asyncio.create_task(self.flush_deletes(message.channel))
+            self.flush_tasks.add(task)
+            task.add_done_callback(self.flush_tasks.discard)
+        pending.append(message)
+
+    async def flush_deletes(self, channel):
+        await asyncio.sleep(1)
+        messages = self.pending_deletes.pop(channel.id, [])
+        for start in range(0, len(messages), 100):
+            batch = messages[start:start + 100]
+            try:
+                await channel.delete_messages(batch)
+            except discord.Forbidden:
+                print("Fehlende Berechtigungen zum Löschen von Nachrichten")
+            except discord.HTTPException:
+                for message in batch:
+                    try:
+                        await message.delete()
+                    except discord.Forbidden:
+                        print("Fehlende Berechtigungen zum Löschen von Nachrichten")
+                    except discord.NotFound:
+                        print("Nachricht wurde bereits gelöscht")
+
+    async def save_rules(self, guild, rules):
+        # compiled before anything is stored, so a re.error leaves the saved rules untouched
+        guild_filter = GuildFilter(rules)
+        await self.config.guild(guild).rules.set(rules)
+        self.filters[guild.id] = guild_filter
+        self.update_route()
+
+    @commands.group()
+    @commands.guild_only()
+    @checks.admin_or_permissions(manage_messages=True)
+    async def linkfilter(self, ctx: commands.Context):
+        """Delete messages by user, role, channel, domain or regex"""
+
+    @linkfilter.command(name="add")
+    async def linkfilter_add(self, ctx: commands.Context, name: str, field: str, *, value: str):
+        """Add a value to a rule, creating it if needed
+
+        Fields: channels, users, roles, domains, patterns.
+        A rule deletes a message if it was sent in one of its channels (any if
+        empty) by one of its users or roles (anyone if both empty) and links one
+        of its domains or matches one of its patterns.
+        """
+        field = field.lower()
+        if field not in FIELDS:
+            await ctx.send(f"Field must be one of {', '.join(FIELDS)}.")
+            return
+
+        try:
+            value = parse_value(field, value)
+        except ValueError as e:
+            await ctx.send(str(e))
+            return
+
+        rules = await self.get_rules(ctx.guild)
+        rule = rules.setdefault(name, {key: [] for key in FIELDS})
+        if value not in rule[field]:
+            rule[field].append(value)
+        try:
+            await self.save_rules(ctx.guild, rules)
+        except re.error as e:
+            await ctx.send(f"Invalid pattern: {e}")
+            return
+        await ctx.tick()
+
+    @linkfilter.command(name="remove")
+    async def linkfilter_remove(self, ctx: commands.Context, name: str, field: str = None, *, value: str = None):
+        """Remove a value from a rule, or the whole rule"""
+        rules = await self.get_rules(ctx.guild)
+        if name not in rules:
+            await ctx.send("No rule with that name.")
+            return
+
+        if field is None:
+            del rules[name]
+        else:
+            field = field.lower()
+            if field not in FIELDS:
+                await ctx.send(f"Field must be one of {', '.join(FIELDS)}.")
+                return
+            if value is None:
+                await ctx.send(f"Which value should be removed from {field}?")
+                return
+            try:
+                value = parse_value(field, value)
+            except ValueError as e:
+                await ctx.send(str(e))
+                return
+            if value not in rules[name][field]:
+                await ctx.send(f"`{name}` has no such value in {field}.")
+                return
+            rules[name][field].remove(value)
+        await self.save_rules(ctx.guild, rules)
+        await ctx.tick()
+
+    @linkfilter.command(name="list")
+    async def linkfilter_list(self, ctx: commands.Context):
+        """Show the rules of this server"""
+        rules = await self.get_rules(ctx.guild)
+        lines = []
+        for name, rule in rules.items():
+            fields = ", ".join(f"{field}: {len(rule[field])}" for field in FIELDS if rule[field])
+            lines.append(f"**{name}** ({fields or 'empty'})")
+        await ctx.send("\n".join(lines) or "No rules set.")
 
 
 async def setup(bot):
@@ -0,0 +1,5 @@
+from .msgrouter import MessageRouter
+
+
+async def setup(bot):
+    await bot.add_cog(MessageRouter(bot))
@@ -0,0 +1,136 @@
+from redbot.core import checks, commands
+import asyncio
+import logging
+import re
+import time
+
+log = logging.getLogger("red.msgrouter")
+
+
+class Route:
+    def __init__(self, cog, channels=None, contains=None, ignore_bots=False, ignore_self=True):
+        self.cog = cog
+        self.handler = cog.on_message
+        self.channels = set(channels) if channels is not None else None
+        self.contains = tuple(contains) if contains else ()
+        self.ignore_bots = ignore_bots
+        self.ignore_self = ignore_self
+
+
+class MessageRouter(commands.Cog):
+    """Single on_message listener that hands messages to the cogs interested in them.
+
+    A cog opts in by defining ``message_route()``, returning a dict with any of
+    ``channels`` (IDs, ``None`` for everywhere), ``contains`` (substrings, one of
+    which must be in the content), ``ignore_bots`` and ``ignore_self``. While it
+    is routed, its own ``on_message`` listener is detached from the bot.
+
+    Routed handlers run in tasks of their own rather than through the bot's
+    event dispatch, so a profiler can set ``observer`` to a callable taking
+    ``(cog_name, event_name, seconds)`` to be told how long each one took.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.routes = {}
+        self.by_channel = {}
+        self.everywhere = ((), None)
+        self.observer = None
+        # the loop only keeps weak references to tasks, so running handlers are held here
+        self.tasks = set()
+
+    async def cog_load(self):
+        for cog in list(self.bot.cogs.values()):
+            if hasattr(cog, "message_route"):
+                self.register(cog)
+
+    async def cog_unload(self):
+        for route in self.routes.values():
+            self.bot.add_listener(route.handler, "on_message")
+        self.routes.clear()
+        self.rebuild()
+
+    def register(self, cog):
+        """(Re)reads the cog's route; call again whenever its predicates change."""
+        name = cog.qualified_name
+        if name not in self.routes:
+            self.bot.remove_listener(cog.on_message, "on_message")
+        self.routes[name] = Route(cog, **cog.message_route())
+        self.rebuild()
+
+    def unregister(self, cog):
+        route = self.routes.get(cog.qualified_name)
+        if route is not None and route.cog is cog:
+            del self.routes[cog.qualified_name]
+            self.rebuild()
+
+    def rebuild(self):
+        everywhere = [route for route in self.routes.values() if route.channels is None]
+        channel_ids = set()
+        for route in self.routes.values():
+            channel_ids |= route.channels or set()
+
+        by_channel = {}
+        for channel_id in channel_ids:
+            by_channel[channel_id] = self.bucket(
+                [route for route in self.routes.values() if route.channels and channel_id in route.channels] + everywhere
+            )
+        self.by_channel = by_channel
+        self.everywhere = self.bucket(everywhere)
+
+    def bucket(self, routes):
+        # only usable as a prefilter if every route in the bucket needs a substring
+        prefilter = None
+        if routes and all(route.contains for route in routes):
+            needles = {needle for route in routes for needle in route.contains}
+            prefilter = re.compile("|".join(map(re.escape, sorted(needles, key=len, reverse=True))))
+        return tuple(routes), prefilter
+
+    @commands.Cog.listener()
+    async def on_cog_add(self, cog):
+        if cog is not self and hasattr(cog, "message_route"):
+            self.register(cog)
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        routes, prefilter = self.by_channel.get(message.channel.id, self.everywhere)
+        if not routes:
+            return
+
+        content = message.content
+        if prefilter is not None and prefilter.search(content) is None:
+            return
+
+        author = message.author
+        for route in routes:
+            if route.ignore_bots and author.bot:
+                continue
+            if route.ignore_self and author.id == self.bot.user.id:
+                continue
+            if route.contains and not any(needle in content for needle in route.contains):
+                continue
+            task = asyncio.create_task(self.run(route, message))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def run(self, route, message):
+        observer = self.observer
+        start = time.perf_counter()
+        try:
+            await route.handler(message)
+        except Exception:
+            log.exception("Error in %s.on_message", route.cog.qualified_name)
+        finally:
+            if observer is not None:
+                observer(route.cog.qualified_name, "on_message", time.perf_counter() - start)
+
+    @commands.command()
+    @checks.is_owner()
+    async def routes(self, ctx: commands.Context):
+        """Show which cogs receive messages through the router"""
+        lines = []
+        for name, route in self.routes.items():
+            channels = ", ".join(f"<#{channel_id}>" for channel_id in route.channels) if route.channels is not None else "all"
+            contains = ", ".join(f"`{needle}`" for needle in route.contains) or "-"
+            lines.append(f"**{name}**: channels {channels}, contains {contains}")
+        await ctx.send("\n".join(lines) or "No cogs routed.")
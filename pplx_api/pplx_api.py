@@ -2,8 +2,6 @@ import discord
 from discord import Message, ui, ButtonStyle
 from redbot.core import Config, checks, commands
 from typing import List
-import openai
-from openai import AsyncOpenAI
 import asyncio
 import re
 import aiohttp
@@ -14,6 +12,8 @@ class PerplexityAI(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
+        self.api_base_url = "https://api.perplexity.ai"
+        self.paste_url = "https://x0.at"
         self.config = Config.get_conf(self, identifier=359554900000)
         default_global = {
             "perplexity_api_key": None,
@@ -29,7 +29,7 @@ class PerplexityAI(commands.Cog):
         return await self.bot.get_shared_api_tokens("perplexity")
 
     async def upload_to_0x0(self, text: str) -> str:
-        url = "https://x0.at"
+        url = self.paste_url
         data = aiohttp.FormData()
         data.add_field('file', text, filename='thinking.txt')
         data.add_field('secret', '')
@@ -176,9 +176,12 @@ class PerplexityAI(commands.Cog):
         return view
 
     async def call_api(self, model: str, api_keys: list, messages: List[dict], max_tokens: int):
+        # imported on first use, openai is slow to import and only needed here
+        from openai import AsyncOpenAI
+
         for key in filter(None, api_keys):
             try:
-                client = AsyncOpenAI(api_key=key, base_url="https://api.perplexity.ai")
+                client = AsyncOpenAI(api_key=key, base_url=self.api_base_url)
                 response = await client.chat.completions.create(
                     model=model,
                     messages=messages,
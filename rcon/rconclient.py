@@ -0,0 +1,192 @@
+import asyncio
+import itertools
+import struct
+
+SERVERDATA_AUTH = 3
+SERVERDATA_AUTH_RESPONSE = 2
+SERVERDATA_EXECCOMMAND = 2
+SERVERDATA_RESPONSE_VALUE = 0
+
+
+class RconError(Exception):
+    pass
+
+
+class RconConnection:
+    """One authenticated Source RCON connection.
+
+    The vanilla server handles one packet per socket read and drops the
+    connection when a read holds more, so only one command is in flight at a
+    time. Once the first response packet arrives an empty RESPONSE_VALUE packet
+    is sent behind it; the server answers that only after the rest of the
+    (possibly split) response, which marks where the reassembled response ends.
+    """
+
+    def __init__(self, host, port, password, timeout=5):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+        self.read_task = None
+        self.ids = itertools.count(1)
+        self.pending = {}
+        self.terminators = {}
+        self.lock = asyncio.Lock()
+        self.closed = True
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        self.closed = False
+        self.read_task = asyncio.create_task(self.read_loop())
+
+        auth_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[auth_id] = (future, None)
+        self.send(auth_id, SERVERDATA_AUTH, self.password or "")
+        try:
+            await self.writer.drain()
+            await asyncio.wait_for(future, self.timeout)
+        except BaseException:
+            self.close()
+            raise
+
+    def send(self, request_id, packet_type, body):
+        payload = body.encode("utf-8") + b"\x00\x00"
+        self.writer.write(struct.pack("<iii", len(payload) + 8, request_id, packet_type) + payload)
+
+    async def read_packet(self):
+        (size,) = struct.unpack("<i", await self.reader.readexactly(4))
+        data = await self.reader.readexactly(size)
+        request_id, packet_type = struct.unpack("<ii", data[:8])
+        return request_id, packet_type, data[8:-2].decode("utf-8", "replace")
+
+    async def read_loop(self):
+        error = RconError("Connection closed")
+        try:
+            while True:
+                request_id, packet_type, body = await self.read_packet()
+
+                if packet_type == SERVERDATA_AUTH_RESPONSE and request_id == -1:
+                    error = RconError("Authentication failed")
+                    break
+
+                if request_id in self.terminators:
+                    command_id = self.terminators.pop(request_id)
+                    future, parts = self.pending.pop(command_id)
+                    if not future.done():
+                        future.set_result("".join(parts))
+                elif request_id in self.pending:
+                    future, parts = self.pending[request_id]
+                    if parts is None:
+                        if packet_type == SERVERDATA_AUTH_RESPONSE:
+                            del self.pending[request_id]
+                            if not future.done():
+                                future.set_result(None)
+                    else:
+                        if not parts:
+                            terminator_id = next(self.ids)
+                            self.terminators[terminator_id] = request_id
+                            self.send(terminator_id, SERVERDATA_RESPONSE_VALUE, "")
+                        parts.append(body)
+        except (OSError, asyncio.IncompleteReadError) as e:
+            error = RconError(f"Connection lost: {e}")
+        finally:
+            self.fail_pending(error)
+            self.close()
+
+    def fail_pending(self, error):
+        for future, _ in self.pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self.pending.clear()
+        self.terminators.clear()
+
+    async def command(self, command):
+        async with self.lock:
+            if self.closed:
+                raise RconError("Not connected")
+
+            command_id = next(self.ids)
+            future = asyncio.get_running_loop().create_future()
+            self.pending[command_id] = (future, [])
+            self.send(command_id, SERVERDATA_EXECCOMMAND, command)
+            await self.writer.drain()
+            try:
+                return await asyncio.wait_for(future, self.timeout)
+            except asyncio.TimeoutError:
+                # a late reply would put a second request in flight, so start over on a new connection
+                self.close()
+                raise
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.writer.close()
+        if self.read_task is not None and self.read_task is not asyncio.current_task():
+            self.read_task.cancel()
+        self.fail_pending(RconError("Connection closed"))
+
+
+class RconPool:
+    """A few persistent RCON connections, opened lazily and reopened when they drop."""
+
+    def __init__(self, host, port, password, size=2, timeout=5):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self.connections = [None] * size
+        self.locks = [asyncio.Lock() for _ in range(size)]
+        self.turn = itertools.cycle(range(size))
+
+    async def acquire(self):
+        index = next(self.turn)
+        async with self.locks[index]:
+            connection = self.connections[index]
+            if connection is None or connection.closed:
+                connection = RconConnection(self.host, self.port, self.password, self.timeout)
+                await connection.connect()
+                self.connections[index] = connection
+        return connection
+
+    async def command(self, command):
+        try:
+            connection = await self.acquire()
+            return await connection.command(command)
+        except (RconError, OSError):
+            # the connection went stale while idle, retry once on a fresh one
+            connection = await self.acquire()
+            return await connection.command(command)
+
+    async def command_many(self, commands):
+        """Runs the commands one after another over one connection.
+
+        Returns one entry per command, in order: its response, or the exception
+        it failed with, so a failing command doesn't lose the others' results.
+        """
+        results = []
+        connection = None
+        for command in commands:
+            try:
+                if connection is None or connection.closed:
+                    connection = await self.acquire()
+                try:
+                    results.append(await connection.command(command))
+                except (RconError, OSError):
+                    # the connection went stale, retry just this command on a fresh one
+                    connection = await self.acquire()
+                    results.append(await connection.command(command))
+            except (RconError, OSError, asyncio.TimeoutError) as e:
+                results.append(e)
+        return results
+
+    async def close(self):
+        for connection in self.connections:
+            if connection is not None:
+                connection.close()
+        self.connections = [None] * len(self.connections)
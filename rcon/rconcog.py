@@ -1,7 +1,9 @@
-from redbot.core import commands
-from mcrcon import MCRcon
+from redbot.core import checks, commands
 from dotenv import load_dotenv
 import os
+import time
+
+from .rconclient import RconPool
 
 load_dotenv()
 
@@ -9,20 +11,94 @@ load_dotenv()
 class RconCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.rcon = RconPool(os.getenv("SERVER_IP") or "192.168.178.167", 25575, os.getenv("SERVER_PASSWORD"))
+        self.whitelist = None
+        self.whitelist_fetched_at = 0
+        self.whitelist_max_age = 300
+
+    async def cog_unload(self):
+        await self.rcon.close()
+
+    async def fetch_whitelist(self):
+        # "There are 2 whitelisted player(s): foo, bar" / "There are no whitelisted players"
+        response = await self.rcon.command("whitelist list")
+        names = response.split(":", 1)[1] if ":" in response else ""
+        self.whitelist = {name.strip().lower() for name in names.split(",") if name.strip()}
+        self.whitelist_fetched_at = time.monotonic()
+        return self.whitelist
+
+    async def get_whitelist(self):
+        if self.whitelist is None or time.monotonic() - self.whitelist_fetched_at > self.whitelist_max_age:
+            return await self.fetch_whitelist()
+        return self.whitelist
+
+    async def update_whitelist(self, ctx, usernames, action):
+        """Runs `whitelist add/remove` for every name that isn't already in the wanted state."""
+        await ctx.typing()
+        usernames = list(dict.fromkeys(usernames))
+        adding = action == "add"
+        try:
+            whitelist = await self.get_whitelist()
+            pending = [name for name in usernames if (name.lower() in whitelist) != adding]
+            responses = await self.rcon.command_many([f"whitelist {action} {name}" for name in pending])
+        except Exception as e:
+            await ctx.message.add_reaction("❌")
+            print(e)
+            return
+
+        results = dict.fromkeys(usernames, "already whitelisted" if adding else "not whitelisted")
+        failed = False
+        for name, response in zip(pending, responses):
+            if isinstance(response, Exception):
+                results[name] = f"error: {str(response) or type(response).__name__}"
+                failed = True
+                continue
+
+            expected = f"Added {name} to the whitelist" if adding else f"Removed {name} from the whitelist"
+            if response.lower() == expected.lower():
+                results[name] = "added" if adding else "removed"
+            elif response not in ("Player is already whitelisted", "Player is not whitelisted"):
+                results[name] = response or "no response"
+                failed = True
+                continue
+
+            if adding:
+                whitelist.add(name.lower())
+            else:
+                whitelist.discard(name.lower())
+
+        await ctx.message.add_reaction("❌" if failed else "✅")
+        if len(usernames) > 1 or failed:
+            await ctx.send("\n".join(f"`{name}`: {result}" for name, result in results.items()))
+
+    @commands.command()
+    async def whitelistadd(self, ctx, *usernames: str):
+        """Add one or more players to the whitelist"""
+        if not usernames:
+            await ctx.send_help()
+            return
+        await self.update_whitelist(ctx, usernames, "add")
+
+    @commands.command()
+    @checks.admin_or_permissions(manage_guild=True)
+    async def whitelistremove(self, ctx, *usernames: str):
+        """Remove one or more players from the whitelist"""
+        if not usernames:
+            await ctx.send_help()
+            return
+        await self.update_whitelist(ctx, usernames, "remove")
 
     @commands.command()
-    async def whitelistadd(self, ctx, username: str):
+    async def whitelistsync(self, ctx):
+        """Reload the cached whitelist from the server"""
         await ctx.typing()
         try:
-            with MCRcon("192.168.178.167", os.getenv("SERVER_PASSWORD"), port=25575) as mcr:
-                response = mcr.command(f"whitelist add {username}")
-                if response == f"Added {username} to the whitelist":
-                    await ctx.message.add_reaction("✅")
-                else:
-                    await ctx.message.add_reaction("❌")
+            whitelist = await self.fetch_whitelist()
         except Exception as e:
             await ctx.message.add_reaction("❌")
             print(e)
+            return
+        await ctx.send(f"{len(whitelist)} players on the whitelist.")
 
 
 def setup(bot):
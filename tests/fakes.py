@@ -0,0 +1,485 @@
+"""Offline stand-ins for Red and discord.py, so the cogs can run without a Discord connection.
+
+``install()`` only fills in modules that are not importable, so with a real
+Red environment the real ``redbot``/``discord`` packages are used and only the
+fake Bot/Guild/Channel/Message/Context objects below come from here.
+"""
+import asyncio
+import copy
+import importlib.util
+import itertools
+import sys
+import tempfile
+import types
+from pathlib import Path
+
+_ids = itertools.count(1000)
+
+# the modules install() put in place because the real package isn't installed
+FAKED = set()
+
+
+# --- Red / discord.py stand-ins -------------------------------------------------
+
+
+class _Command:
+    def __init__(self, func, name=None):
+        self.callback = func
+        self.name = name or func.__name__
+        self.qualified_name = self.name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return types.MethodType(self.callback, instance)
+
+    def command(self, name=None, **kwargs):
+        return lambda func: _Command(func, name)
+
+    def autocomplete(self, name):
+        return lambda func: func
+
+    def error(self, func):
+        return func
+
+
+def _decorator(*args, **kwargs):
+    return lambda func: func
+
+
+def _command(name=None, **kwargs):
+    return lambda func: _Command(func, name)
+
+
+class _Cog:
+    @staticmethod
+    def listener(name=None):
+        return lambda func: func
+
+    @property
+    def qualified_name(self):
+        return type(self).__name__
+
+
+class _Loop:
+    """``discord.ext.tasks.loop`` that never runs on its own; tests call the coroutine directly."""
+
+    def __init__(self, coro):
+        self.coro = coro
+        self.running = {}
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        loop = self
+
+        class Bound:
+            def start(self):
+                loop.running[id(instance)] = True
+
+            def cancel(self):
+                loop.running[id(instance)] = False
+
+            def is_running(self):
+                return loop.running.get(id(instance), False)
+
+            def change_interval(self, **kwargs):
+                pass
+
+            async def __call__(self, *args):
+                return await loop.coro(instance, *args)
+
+        return Bound()
+
+    def before_loop(self, func):
+        return func
+
+
+def _loop(**kwargs):
+    return lambda coro: _Loop(coro)
+
+
+class _ValueContext:
+    def __init__(self, value):
+        self.value = value
+
+    def __await__(self):
+        return self.value._get().__await__()
+
+    async def __aenter__(self):
+        self.current = await self.value._get()
+        return self.current
+
+    async def __aexit__(self, *exc):
+        await self.value.set(self.current)
+
+
+class _Value:
+    def __init__(self, config, scope, key, name):
+        self.config, self.scope, self.key, self.name = config, scope, key, name
+
+    async def _get(self):
+        stored = self.config.data.get((self.scope, self.key), {})
+        default = copy.deepcopy(self.config.defaults[self.scope][self.name])
+        if self.name not in stored:
+            return default
+        value = copy.deepcopy(stored[self.name])
+        if isinstance(default, dict) and isinstance(value, dict):
+            # like Red, missing keys of a dict default are merged back in on read
+            default.update(value)
+            return default
+        return value
+
+    def __call__(self):
+        return _ValueContext(self)
+
+    async def set(self, value):
+        self.config.data.setdefault((self.scope, self.key), {})[self.name] = copy.deepcopy(value)
+
+
+class _AllValue(_Value):
+    async def _get(self):
+        merged = copy.deepcopy(self.config.defaults[self.scope])
+        merged.update(copy.deepcopy(self.config.data.get((self.scope, self.key), {})))
+        return merged
+
+    async def set(self, value):
+        self.config.data[(self.scope, self.key)] = copy.deepcopy(value)
+
+
+class _Group:
+    def __init__(self, config, scope, key):
+        self._config, self._scope, self._key = config, scope, key
+
+    def __getattr__(self, name):
+        return _Value(self._config, self._scope, self._key, name)
+
+    def all(self):
+        return _ValueContext(_AllValue(self._config, self._scope, self._key, None))
+
+
+class FakeConfig:
+    """In-memory ``redbot.core.Config`` with the scopes the cogs use."""
+
+    def __init__(self):
+        self.defaults = {"global": {}, "guild": {}, "channel": {}}
+        self.data = {}
+
+    @classmethod
+    def get_conf(cls, cog, identifier, **kwargs):
+        return cls()
+
+    def register_global(self, **defaults):
+        self.defaults["global"].update(defaults)
+
+    def register_guild(self, **defaults):
+        self.defaults["guild"].update(defaults)
+
+    def register_channel(self, **defaults):
+        self.defaults["channel"].update(defaults)
+
+    def __getattr__(self, name):
+        return getattr(_Group(self, "global", None), name)
+
+    def all(self):
+        return _Group(self, "global", None).all()
+
+    def guild(self, guild):
+        return _Group(self, "guild", guild.id)
+
+    def guild_from_id(self, guild_id):
+        return _Group(self, "guild", guild_id)
+
+    def channel(self, channel):
+        return _Group(self, "channel", channel.id)
+
+    def channel_from_id(self, channel_id):
+        return _Group(self, "channel", channel_id)
+
+    async def _all_scope(self, scope):
+        result = {}
+        for (stored_scope, key), values in self.data.items():
+            if stored_scope == scope:
+                merged = copy.deepcopy(self.defaults[scope])
+                merged.update(copy.deepcopy(values))
+                result[key] = merged
+        return result
+
+    async def all_guilds(self):
+        return await self._all_scope("guild")
+
+    async def all_channels(self):
+        return await self._all_scope("channel")
+
+
+class _HTTPException(Exception):
+    pass
+
+
+class _Forbidden(_HTTPException):
+    pass
+
+
+class _NotFound(_HTTPException):
+    pass
+
+
+class _AllowedMentions:
+    @classmethod
+    def none(cls):
+        return cls()
+
+
+class _Anything:
+    def __init__(self, *args, **kwargs):
+        self.args, self.kwargs = args, kwargs
+
+    def __getattr__(self, name):
+        return _Anything()
+
+    def __call__(self, *args, **kwargs):
+        return _Anything()
+
+
+def _module(name, **attributes):
+    FAKED.add(name.split(".")[0])
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    sys.modules[name] = module
+    return module
+
+
+def _install_discord():
+    discord = _module(
+        "discord",
+        HTTPException=_HTTPException,
+        Forbidden=_Forbidden,
+        NotFound=_NotFound,
+        AllowedMentions=_AllowedMentions,
+        TextChannel=_Anything,
+        Interaction=_Anything,
+        Message=_Anything,
+        DeletedReferencedMessage=_Anything,
+        ButtonStyle=_Anything(),
+        Color=_Anything(),
+        Embed=_Anything,
+        File=_Anything,
+        utils=types.SimpleNamespace(get=lambda iterable, **attrs: None),
+    )
+    discord.ui = _module("discord.ui", View=_Anything, Button=_Anything)
+    discord.app_commands = _module("discord.app_commands", describe=_decorator, Choice=_Anything)
+    discord.ext = _module("discord.ext")
+    discord.ext.tasks = _module("discord.ext.tasks", loop=_loop)
+
+
+def _install_redbot():
+    commands = _module(
+        "redbot.core.commands",
+        Cog=_Cog,
+        Context=object,
+        command=_command,
+        group=_command,
+        hybrid_command=_command,
+        guild_only=_decorator,
+        admin_or_permissions=_decorator,
+        is_owner=_decorator,
+    )
+    checks = _module("redbot.core.checks", is_owner=_decorator, admin=_decorator, admin_or_permissions=_decorator)
+    data_dir = Path(tempfile.mkdtemp(prefix="redbot-modules-"))
+    data_manager = _module("redbot.core.data_manager", cog_data_path=lambda cog=None, **kwargs: data_dir)
+    chat_formatting = _module(
+        "redbot.core.utils.chat_formatting",
+        box=lambda text, lang="": f"```{lang}\n{text}\n```",
+        pagify=lambda text, **kwargs: [text],
+    )
+    core = _module("redbot.core", commands=commands, checks=checks, Config=FakeConfig, data_manager=data_manager)
+    core.utils = _module("redbot.core.utils", chat_formatting=chat_formatting)
+    _module("redbot", core=core)
+
+
+def _missing(name):
+    return name not in sys.modules and importlib.util.find_spec(name) is None
+
+
+def install():
+    if _missing("discord"):
+        _install_discord()
+    if _missing("redbot"):
+        _install_redbot()
+    if _missing("dotenv"):
+        _module("dotenv", load_dotenv=lambda *args, **kwargs: None)
+    if _missing("aiohttp"):
+        _module("aiohttp", ClientSession=_Anything, ClientTimeout=_Anything, ClientError=OSError, FormData=_Anything)
+
+
+# --- fake Discord objects ------------------------------------------------------------
+
+
+class FakeEmoji:
+    def __init__(self, emoji_id, guild_id, name="emoji"):
+        self.id = emoji_id
+        self.guild_id = guild_id
+        self.name = name
+
+    def __str__(self):
+        return f"<:{self.name}:{self.id}>"
+
+
+class FakeRole:
+    def __init__(self, role_id):
+        self.id = role_id
+
+
+class FakeAuthor:
+    def __init__(self, author_id=None, bot=False, roles=()):
+        self.id = author_id or next(_ids)
+        self.bot = bot
+        self.roles = [FakeRole(role_id) for role_id in roles]
+        self.mention = f"<@{self.id}>"
+
+
+class FakeGuild:
+    def __init__(self, guild_id=None, emoji_ids=()):
+        self.id = guild_id or next(_ids)
+        self.emojis = [FakeEmoji(emoji_id, self.id) for emoji_id in emoji_ids]
+        self.fetches = 0
+
+    async def fetch_emoji(self, emoji_id):
+        self.fetches += 1
+        await asyncio.sleep(0)
+        for emoji in self.emojis:
+            if emoji.id == emoji_id:
+                return emoji
+        return FakeEmoji(emoji_id, self.id)
+
+
+class FakeChannel:
+    def __init__(self, channel_id=None, guild=None):
+        self.id = channel_id or next(_ids)
+        self.guild = guild
+        self.sent = []
+        self.deleted = []
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append(content)
+        return FakeMessage(content or "", channel=self, guild=self.guild)
+
+    async def delete_messages(self, messages):
+        self.deleted.extend(messages)
+
+
+class FakeMessage:
+    def __init__(self, content, author=None, channel=None, guild=None):
+        self.id = next(_ids)
+        self.content = content
+        self.author = author or FakeAuthor()
+        self.guild = guild if guild is not None else getattr(channel, "guild", None)
+        self.channel = channel or FakeChannel(guild=self.guild)
+        self.reactions = []
+        self.replies = []
+        self.deleted = False
+        self.suppressed = False
+        self.embeds = []
+        self.reference = None
+
+    async def add_reaction(self, emoji):
+        await asyncio.sleep(0)
+        self.reactions.append(emoji)
+
+    async def reply(self, content=None, **kwargs):
+        self.replies.append(content)
+        return FakeMessage(content or "", channel=self.channel, guild=self.guild)
+
+    async def edit(self, **kwargs):
+        self.suppressed = kwargs.get("suppress", self.suppressed)
+
+    async def delete(self):
+        self.deleted = True
+
+
+class _Typing:
+    """``ctx.typing()``, which can be awaited or used as ``async with``."""
+
+    def __await__(self):
+        return asyncio.sleep(0).__await__()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+class FakeContext:
+    def __init__(self, bot, message, prefix="!"):
+        self.bot = bot
+        self.message = message
+        self.author = message.author
+        self.channel = message.channel
+        self.guild = message.guild
+        self.prefix = prefix
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append(content)
+        return await self.channel.send(content, **kwargs)
+
+    def typing(self):
+        return _Typing()
+
+    async def tick(self):
+        await self.message.add_reaction("✅")
+
+    async def send_help(self):
+        self.sent.append("help")
+
+
+class FakeBot:
+    def __init__(self):
+        self.user = FakeAuthor(bot=True)
+        self.cogs = {}
+        self.guilds = []
+        self.channels = {}
+        self.emojis = {}
+        self.listeners = {}
+        self.shared_api_tokens = {}
+
+    @property
+    def loop(self):
+        return asyncio.get_running_loop()
+
+    def add_cog_sync(self, cog):
+        self.cogs[cog.qualified_name] = cog
+        return cog
+
+    async def add_cog(self, cog):
+        if hasattr(cog, "cog_load"):
+            await cog.cog_load()
+        self.add_cog_sync(cog)
+        for other in list(self.cogs.values()):
+            if other is not cog and hasattr(other, "on_cog_add"):
+                await other.on_cog_add(cog)
+        return cog
+
+    def get_cog(self, name):
+        return self.cogs.get(name)
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def get_emoji(self, emoji_id):
+        return self.emojis.get(emoji_id)
+
+    def add_listener(self, func, name=None):
+        self.listeners.setdefault(name or func.__name__, []).append(func)
+
+    def remove_listener(self, func, name=None):
+        listeners = self.listeners.get(name or func.__name__, [])
+        if func in listeners:
+            listeners.remove(func)
+
+    async def wait_until_ready(self):
+        pass
+
+    async def get_shared_api_tokens(self, service):
+        return self.shared_api_tokens.get(service, {})
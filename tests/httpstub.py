@@ -0,0 +1,152 @@
+"""Local stand-ins for the HTTP APIs the cogs talk to, all on one port.
+
+    /srrdb/v1/nfo/<release>        srrDB NFO lookup, ``nfolink`` points back here
+    /srrdb/download/<release>.nfo  the NFO itself
+    /xrel/v2/oauth2/token          xREL client credentials token
+    /xrel/v2/release/info.json     xREL scene release lookup by ``dirname``
+    /xrel/v2/p2p/rls_info.json     xREL P2P release lookup by ``dirname``
+    /xrel/v2/nfo/<type>.json       xREL rendered NFO image by ``id``
+    /pplx/chat/completions         Perplexity's OpenAI compatible chat API
+    /paste                         x0.at style paste host, answers with the paste URL
+    /page                          a shop page for AvailabilityChecker
+
+Releases in ``srrdb_releases``/``xrel_releases``/``p2p_releases`` are found,
+everything else is not. getnfo fetches with ``requests`` and ``curl``, which
+block the event loop, so the server runs on a thread of its own instead of on
+the loop under test. ``latency`` is added to every response.
+"""
+import itertools
+import json
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# smallest valid PNG, what xREL's NFO endpoint returns is an image
+PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c63000100000500010d0a2db40000000049454e44ae426082"
+)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # the default backlog of 5 makes a burst of new connections wait out a SYN retransmit
+    request_queue_size = 128
+
+
+class StubHttpServer:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.srrdb_releases = set()
+        self.xrel_releases = set()
+        self.p2p_releases = set()
+        self.answer = "<think>Erst nachdenken.</think>Die Antwort ist 42."
+        self.citations = ["https://example.com/42"]
+        self.page = "<html>Auf Lager</html>"
+        self.requests = []
+        self.pastes = []
+        self.ids = itertools.count(1)
+        self.server = None
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.handle(self, "GET")
+
+            def do_POST(self):
+                stub.handle(self, "POST")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = _Server(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def handle(self, request, method):
+        parts = urlsplit(request.path)
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        length = int(request.headers.get("Content-Length") or 0)
+        body = request.rfile.read(length) if length else b""
+        self.requests.append((method, parts.path))
+        if self.latency:
+            time.sleep(self.latency)
+
+        status, content_type, payload = self.route(method, parts.path, query, body)
+        if not isinstance(payload, bytes):
+            payload = json.dumps(payload).encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(payload)))
+        request.end_headers()
+        request.wfile.write(payload)
+
+    def route(self, method, path, query, body):
+        if path.startswith("/srrdb/v1/nfo/"):
+            release = path.rsplit("/", 1)[1]
+            if release not in self.srrdb_releases:
+                return 200, "application/json", {"release": None, "nfo": [], "nfolink": []}
+            return 200, "application/json", {
+                "release": release,
+                "nfo": [f"{release}.nfo"],
+                "nfolink": [f"{self.url}/srrdb/download/{release}.nfo"],
+            }
+        if path.startswith("/srrdb/download/"):
+            return 200, "text/plain", f"{path.rsplit('/', 1)[1]}\r\n\r\n  greetings to all the crews\r\n".encode("cp437")
+
+        if path == "/xrel/v2/oauth2/token" and method == "POST":
+            return 200, "application/json", {"token_type": "Bearer", "access_token": "stub.access.token", "expires_in": 3600}
+        if path in ("/xrel/v2/release/info.json", "/xrel/v2/p2p/rls_info.json"):
+            releases = self.xrel_releases if path.startswith("/xrel/v2/release/") else self.p2p_releases
+            release = query.get("dirname")
+            if release not in releases:
+                return 404, "application/json", {"error": "not_found", "error_description": "Release not found."}
+            return 200, "application/json", {
+                "id": f"{zlib.crc32(release.encode()):08x}",
+                "dirname": release,
+                "link_href": f"https://www.xrel.to/release/{release}.html",
+                "ext_info": {"link_href": f"https://www.xrel.to/ext/{release}.html"},
+                "comments": 3,
+            }
+        if path.startswith("/xrel/v2/nfo/"):
+            return 200, "image/png", PNG
+
+        if path == "/pplx/chat/completions" and method == "POST":
+            request = json.loads(body or b"{}")
+            return 200, "application/json", {
+                "id": f"chatcmpl-{next(self.ids)}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", ""),
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": self.answer}}],
+                "citations": self.citations,
+                "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+            }
+        if path == "/paste" and method == "POST":
+            self.pastes.append(body)
+            return 200, "text/plain", f"{self.url}/paste/{len(self.pastes)}.txt\n".encode("utf-8")
+
+        if path == "/page":
+            return 200, "text/html", self.page.encode("utf-8")
+        return 404, "text/plain", b"not found"
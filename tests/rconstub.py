@@ -0,0 +1,128 @@
+"""Local Source RCON server that behaves like the vanilla Minecraft one.
+
+Like vanilla, it handles exactly one packet per socket read and drops the
+connection if a read holds more (or less) than one whole packet, so any
+client that writes a second packet before the first was answered fails here
+the same way it would against a real server. Responses over 4096 bytes are
+split into several packets, and packets of an unknown type are answered with
+"Unknown request <type>". ``unknown_players`` get vanilla's "That player
+does not exist", and commands in ``crash_on`` drop the connection instead of
+being answered.
+"""
+import asyncio
+import struct
+
+MAX_RESPONSE = 4096
+
+
+class VanillaRconServer:
+    def __init__(self, password="hunter2", latency=0.0):
+        self.password = password
+        self.latency = latency
+        self.whitelist = set()
+        self.unknown_players = set()
+        self.crash_on = set()
+        self.commands = []
+        self.connections = 0
+        self.dropped = 0
+        self.writers = []
+        self.handlers = set()
+        self.server = None
+        self.port = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        self.drop_connections()
+        self.server.close()
+        await self.server.wait_closed()
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+
+    def drop_connections(self):
+        for writer in self.writers:
+            writer.transport.abort()
+        self.writers.clear()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def send(self, writer, request_id, packet_type, body):
+        payload = body.encode("utf-8") + b"\x00\x00"
+        writer.write(struct.pack("<iii", len(payload) + 8, request_id, packet_type) + payload)
+
+    def respond(self, writer, request_id, body):
+        for start in range(0, max(len(body), 1), MAX_RESPONSE):
+            self.send(writer, request_id, 0, body[start:start + MAX_RESPONSE])
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        self.writers.append(writer)
+        self.handlers.add(asyncio.current_task())
+        authenticated = False
+        try:
+            while True:
+                data = await reader.read(1460)
+                if not data:
+                    break
+                (size,) = struct.unpack("<i", data[:4])
+                if len(data) != size + 4:
+                    # vanilla reads one packet per read and gives up on anything else
+                    self.dropped += 1
+                    break
+
+                request_id, packet_type = struct.unpack("<ii", data[4:12])
+                body = data[12:-2].decode("utf-8")
+
+                if packet_type == 3:
+                    authenticated = body == self.password
+                    self.send(writer, request_id if authenticated else -1, 2, "")
+                elif packet_type == 2 and authenticated:
+                    if body in self.crash_on:
+                        self.dropped += 1
+                        break
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    self.commands.append(body)
+                    self.respond(writer, request_id, self.execute(body))
+                else:
+                    self.respond(writer, request_id, f"Unknown request {packet_type:x}")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            self.handlers.discard(asyncio.current_task())
+
+    def execute(self, command):
+        parts = command.split()
+        if parts[:1] == ["whitelist"] and len(parts) == 3 and parts[2] in self.unknown_players:
+            return "That player does not exist"
+        if parts[:2] == ["whitelist", "add"] and len(parts) == 3:
+            if parts[2].lower() in {name.lower() for name in self.whitelist}:
+                return "Player is already whitelisted"
+            self.whitelist.add(parts[2])
+            return f"Added {parts[2]} to the whitelist"
+        if parts[:2] == ["whitelist", "remove"] and len(parts) == 3:
+            for name in list(self.whitelist):
+                if name.lower() == parts[2].lower():
+                    self.whitelist.discard(name)
+                    return f"Removed {parts[2]} from the whitelist"
+            return "Player is not whitelisted"
+        if parts[:2] == ["whitelist", "list"]:
+            if not self.whitelist:
+                return "There are no whitelisted players"
+            names = sorted(self.whitelist)
+            return f"There are {len(names)} whitelisted player(s): {', '.join(names)}"
+        if parts[:1] == ["kick"] and len(parts) >= 2:
+            return f"Kicked {parts[1]}: {' '.join(parts[2:]) or 'Kicked by an operator'}"
+        if parts[:1] == ["echo"]:
+            return " ".join(parts[1:])
+        if parts[:1] == ["long"]:
+            return "x" * int(parts[1])
+        return "Unknown or incomplete command, see below for error"
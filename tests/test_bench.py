@@ -0,0 +1,33 @@
+import pytest
+
+from bench import harness
+
+
+def test_harness_runs_every_scenario(tmp_path, capsys):
+    baseline = tmp_path / "baseline.json"
+    sizes = ["--messages", "300", "--invocations", "10", "--rules", "200", "--rcon-calls", "5", "--concurrency", "8"]
+
+    results = harness.main(["listeners", "whitelist", "micro", *sizes, "--save-baseline", str(baseline)])
+    assert results["listeners"]["throughput"] > 0
+    assert results["whitelist"]["failures"] == 0
+    assert results["whitelist"]["dropped_connections"] == 0
+    assert results["micro"]["ruleset_match_us"] > 0
+
+    routed = harness.main(["listeners", "--router", *sizes, "--baseline", str(baseline)])
+    assert routed["listeners"]["rcon_commands"] == results["listeners"]["rcon_commands"]
+    assert "%" in capsys.readouterr().out
+
+
+def test_imports_scenario_times_each_cog():
+    results = harness.main(["imports"])
+    assert "msgrouter_cold_ms" in results["imports"]
+    assert "kicker_warm_ms" in results["imports"]
+
+
+@pytest.mark.parametrize("scenario", ["nfo", "perplexity", "availability"])
+def test_http_scenarios_run_against_the_stubs(scenario):
+    results = harness.main([scenario, "--requests", "12", "--concurrency", "4", "--http-latency", "0"])
+    if scenario not in results:
+        pytest.skip("the scenario's HTTP client isn't installed")
+    assert results[scenario]["throughput"] > 0
+    assert results[scenario].get("failures", 0) == 0
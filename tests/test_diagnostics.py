@@ -0,0 +1,102 @@
+import asyncio
+import time
+import types
+
+from diagnostics.diagnostics import Diagnostics
+from msgrouter.msgrouter import MessageRouter
+from tests.fakes import FakeBot, FakeContext, FakeMessage
+
+
+class Slow:
+    qualified_name = "Slow"
+
+    def message_route(self):
+        return {"channels": None}
+
+    async def on_message(self, message):
+        await asyncio.sleep(0.02)
+
+
+async def run_event(coro, event_name, *args, **kwargs):
+    await coro(*args, **kwargs)
+
+
+def make_bot():
+    bot = FakeBot()
+    bot._run_event = run_event
+    bot.add_cog_sync(Slow())
+    return bot
+
+
+async def route_one(bot):
+    router = bot.get_cog("MessageRouter")
+    await router.on_message(FakeMessage("hello"))
+    await asyncio.sleep(0.05)
+
+
+def test_routed_handlers_are_timed_under_their_own_cog():
+    async def run():
+        for order in ((MessageRouter, Diagnostics), (Diagnostics, MessageRouter)):
+            bot = make_bot()
+            for cog in order:
+                await bot.add_cog(cog(bot))
+            diagnostics = bot.get_cog("Diagnostics")
+            diagnostics.sample_rate = 1.0
+
+            await route_one(bot)
+            histogram = diagnostics.listener_timings[("Slow", "on_message")]
+            assert histogram.count == 1
+            assert histogram.total >= 0.02
+
+            diagnostics.cog_unload()
+            assert bot.get_cog("MessageRouter").observer is None
+
+    asyncio.run(run())
+
+
+def test_sampling_applies_to_routed_handlers():
+    async def run():
+        bot = make_bot()
+        await bot.add_cog(MessageRouter(bot))
+        await bot.add_cog(Diagnostics(bot))
+        diagnostics = bot.get_cog("Diagnostics")
+        diagnostics.sample_rate = 0.0
+
+        await route_one(bot)
+        assert ("Slow", "on_message") not in diagnostics.listener_timings
+        diagnostics.cog_unload()
+
+    asyncio.run(run())
+
+
+def test_commands_are_timed_around_blocking_code():
+    async def run():
+        bot = make_bot()
+        chained = []
+
+        async def after_invoke(ctx):
+            chained.append(ctx)
+
+        bot._after_invoke = after_invoke
+        diagnostics = await bot.add_cog(Diagnostics(bot))
+        diagnostics.sample_rate = 1.0
+
+        ctx = FakeContext(bot, FakeMessage("!slow"))
+        ctx.cog = bot.get_cog("Slow")
+        ctx.command = types.SimpleNamespace(qualified_name="slow")
+
+        # what discord.py does: before hook, callback, after hook, all in the command's task
+        await bot._before_invoke(ctx)
+        time.sleep(0.02)
+        await bot._after_invoke(ctx)
+
+        histogram = diagnostics.command_timings[("Slow", "slow")]
+        assert histogram.count == 1
+        assert histogram.total >= 0.02
+        assert chained == [ctx]
+
+        diagnostics.cog_unload()
+        assert bot._before_invoke is None
+        assert bot._after_invoke is after_invoke
+
+    asyncio.run(run())
@@ -0,0 +1,38 @@
+import asyncio
+import shutil
+
+import pytest
+
+from getnfo.getnfo import getnfo
+from tests.fakes import FakeBot, FakeContext, FakeMessage
+from tests.httpstub import PNG, StubHttpServer
+
+pytestmark = pytest.mark.skipif(shutil.which("curl") is None, reason="getnfo talks to xREL through curl")
+
+
+def test_xrel_lookup_and_nfo_download_against_stub():
+    async def run():
+        with StubHttpServer() as stub:
+            stub.p2p_releases.add("Stub.Release-GRP")
+            bot = FakeBot()
+            cog = getnfo(bot)
+            cog.xrel_api_base_url = f"{stub.url}/xrel/v2"
+            ctx = FakeContext(bot, FakeMessage("!nfo Stub.Release-GRP"))
+
+            response = await cog.fetch_xrel_response(ctx, "Stub.Release-GRP")
+            assert response["success"]
+            assert response["data"]["nfo_type"] == "p2p_rls"
+            assert cog.token == "stub.access.token"
+
+            missing = await cog.fetch_xrel_response(ctx, "Unknown.Release-GRP")
+            assert missing["success"] is False
+
+            nfo = cog.download_xrel_nfo(cog.token, "p2p_rls", response["data"]["release_info"]["id"])
+            assert nfo == PNG
+
+        # the hourly token refresh the cog schedules on construction
+        for task in asyncio.all_tasks():
+            if task is not asyncio.current_task():
+                task.cancel()
+
+    asyncio.run(run())
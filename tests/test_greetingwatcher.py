@@ -0,0 +1,199 @@
+import asyncio
+import random
+import types
+
+import pytest
+
+from GreetingWatcher import greetingwatcher
+from GreetingWatcher.greetingwatcher import GreetingWatcher
+from GreetingWatcher.reactionqueue import ReactionQueue
+from tests.fakes import FakeAuthor, FakeBot, FakeChannel, FakeGuild, FakeMessage
+
+CHANNEL_ID = 1218208566817587362
+DIGITS = {str(digit): emoji for digit, emoji in enumerate(
+    ["0️⃣", "1️⃣", "2️⃣", "3️⃣", "4️⃣", "5️⃣", "6️⃣", "7️⃣", "8️⃣", "9️⃣"]
+)}
+
+
+def streak_emojis(count):
+    if count < 3 or count >= 33:
+        return []
+    if count == 11:
+        return ["⏸️"]
+    if count == 22:
+        return ["2️⃣", "🥈"]
+    if count == 10:
+        return ["🔟"]
+    return [DIGITS[digit] for digit in str(count)]
+
+
+@pytest.fixture(autouse=True)
+def morning(monkeypatch):
+    now = types.SimpleNamespace(hour=7)
+    monkeypatch.setattr(greetingwatcher, "datetime", types.SimpleNamespace(
+        datetime=types.SimpleNamespace(now=lambda: now)
+    ))
+
+
+async def make_cog(config=None):
+    bot = FakeBot()
+    cog = GreetingWatcher(bot)
+    if config is not None:
+        cog.config = config
+    await cog.cog_load()
+
+    rng = random.Random(26)
+    resolve = cog.get_emoji
+
+    async def slow_get_emoji(guild, name):
+        # yield a random number of times so concurrent messages really interleave
+        for _ in range(rng.randint(0, 5)):
+            await asyncio.sleep(0)
+        return await resolve(guild, name)
+
+    cog.get_emoji = slow_get_emoji
+    return cog
+
+
+async def drain(cog):
+    for _ in range(1000):
+        await asyncio.sleep(0)
+        if all(queue.empty() for queue in cog.reactions.queues.values()):
+            break
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def gumo(channel, author):
+    return FakeMessage("gumo", author=author, channel=channel)
+
+
+def test_interleaved_distinct_authors_count_every_member_once():
+    async def run():
+        cog = await make_cog()
+        channel = FakeChannel(CHANNEL_ID, guild=FakeGuild())
+        messages = [gumo(channel, FakeAuthor()) for _ in range(30)]
+
+        await asyncio.gather(*(cog.on_message(message) for message in messages))
+        await drain(cog)
+
+        streak = cog.streaks[CHANNEL_ID]
+        assert streak.count == 30
+        assert streak.users == {message.author.id for message in messages}
+
+        # every message got its greeting reaction, and every streak number was handed out exactly once
+        feelsokman = cog.emojis["feelsokman"]
+        numbers = []
+        for message in messages:
+            assert [reaction.id for reaction in message.reactions[:1]] == [feelsokman]
+            numbers.append(message.reactions[1:])
+        expected = [streak_emojis(count) for count in range(1, 31)]
+        assert sorted(map(tuple, numbers)) == sorted(map(tuple, expected))
+
+        await cog.cog_unload()
+
+    asyncio.run(run())
+
+
+def test_interleaved_repeated_authors_keep_count_and_members_consistent():
+    async def run():
+        cog = await make_cog()
+        channel = FakeChannel(CHANNEL_ID, guild=FakeGuild())
+        authors = [FakeAuthor() for _ in range(10)]
+        messages = [gumo(channel, author) for author in authors * 3]
+        random.Random(29).shuffle(messages)
+
+        await asyncio.gather(*(cog.on_message(message) for message in messages))
+        await drain(cog)
+
+        streak = cog.streaks[CHANNEL_ID]
+        assert streak.count == len(streak.users)
+        assert streak.users <= {author.id for author in authors}
+        await cog.cog_unload()
+
+    asyncio.run(run())
+
+
+def test_repeated_author_breaks_streak_with_grr():
+    async def run():
+        cog = await make_cog()
+        channel = FakeChannel(CHANNEL_ID, guild=FakeGuild())
+        first, second, third = FakeAuthor(), FakeAuthor(), FakeAuthor()
+        messages = [gumo(channel, author) for author in (first, second, third, first)]
+
+        for message in messages:
+            await cog.on_message(message)
+        await drain(cog)
+
+        streak = cog.streaks[CHANNEL_ID]
+        assert streak.count == 0
+        assert streak.users == set()
+        assert messages[2].reactions[1:] == ["3️⃣"]
+        assert cog.emojis["grr"] in [reaction.id for reaction in messages[3].reactions]
+        await cog.cog_unload()
+
+    asyncio.run(run())
+
+
+def test_channels_keep_separate_streaks():
+    async def run():
+        cog = await make_cog()
+        other_id = CHANNEL_ID + 1
+        cog.channels.add(other_id)
+        guild = FakeGuild()
+        first, second = FakeChannel(CHANNEL_ID, guild=guild), FakeChannel(other_id, guild=guild)
+        messages = [gumo(first, FakeAuthor()) for _ in range(5)] + [gumo(second, FakeAuthor()) for _ in range(7)]
+        random.Random(31).shuffle(messages)
+
+        await asyncio.gather(*(cog.on_message(message) for message in messages))
+        await drain(cog)
+
+        assert cog.streaks[CHANNEL_ID].count == 5
+        assert cog.streaks[other_id].count == 7
+        await cog.cog_unload()
+
+    asyncio.run(run())
+
+
+def test_streaks_are_flushed_in_batches_and_restored():
+    async def run():
+        cog = await make_cog()
+        channel = FakeChannel(CHANNEL_ID, guild=FakeGuild())
+        authors = [FakeAuthor() for _ in range(4)]
+
+        await asyncio.gather(*(cog.on_message(gumo(channel, author)) for author in authors))
+        assert await cog.config.channel_from_id(CHANNEL_ID).streak() == 0
+
+        await cog.flush_streaks()
+        assert await cog.config.channel_from_id(CHANNEL_ID).streak() == 4
+        assert cog.dirty == set()
+        await cog.cog_unload()
+
+        reloaded = await make_cog(config=cog.config)
+        assert reloaded.streaks[CHANNEL_ID].count == 4
+        assert reloaded.streaks[CHANNEL_ID].users == {author.id for author in authors}
+        await reloaded.cog_unload()
+
+    asyncio.run(run())
+
+
+def test_reaction_worker_survives_connection_errors():
+    async def run():
+        queue = ReactionQueue()
+        channel = FakeChannel(CHANNEL_ID, guild=FakeGuild())
+        broken, fine = gumo(channel, FakeAuthor()), gumo(channel, FakeAuthor())
+
+        async def add_reaction(emoji):
+            raise OSError("connection reset")
+
+        broken.add_reaction = add_reaction
+        queue.add(broken, "1️⃣")
+        queue.add(fine, "2️⃣")
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        assert fine.reactions == ["2️⃣"]
+        assert not queue.workers[CHANNEL_ID].done()
+        queue.close()
+
+    asyncio.run(run())
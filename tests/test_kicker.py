@@ -0,0 +1,81 @@
+from kicker.kicker import RuleSet
+
+
+def rule(matcher, pattern, action="kick"):
+    return {"matcher": matcher, "pattern": pattern, "action": action}
+
+
+def test_literal_word_and_regex_rules():
+    literal, words, regex = rule("literal", "sex"), rule("words", "foo bar", "warn"), rule("regex", r"b[a4]d+", "log")
+    ruleset = RuleSet([literal, words, regex])
+    assert ruleset.match("what is SEXY") is literal
+    assert ruleset.match("a bar here") is words
+    assert ruleset.match("barn") is None
+    assert ruleset.match("so b4ddd") is regex
+    assert ruleset.match("nothing") is None
+
+
+def test_backreference_rule_matches():
+    repeated = rule("regex", r"(a)\1")
+    ruleset = RuleSet([rule("literal", "sex"), repeated])
+    assert ruleset.match("aa") is repeated
+    assert ruleset.match("a") is None
+
+
+def test_named_groups_and_backreferences_in_several_rules():
+    first = rule("regex", r"(?P<x>o)(?P=x)")
+    second = rule("regex", r"(?P<x>e)(?P=x)")
+    ruleset = RuleSet([first, second])
+    assert ruleset.match("see") is second
+    assert ruleset.match("moon") is first
+
+
+def test_earliest_match_wins_across_combined_and_separate_rules():
+    literal, repeated = rule("literal", "zz"), rule("regex", r"(\w)\1")
+    ruleset = RuleSet([literal, repeated])
+    assert ruleset.match("look at zz") is repeated
+    assert ruleset.match("zz look") is literal
+
+
+def test_overlapping_needles_prefer_the_longest():
+    short, long = rule("literal", "bad"), rule("literal", "badder")
+    ruleset = RuleSet([short, long])
+    assert ruleset.match("even BADDER") is long
+    assert ruleset.match("bad") is short
+    assert ruleset.match("badde") is short
+
+
+def test_words_need_word_boundaries_with_shared_prefixes():
+    short, long = rule("words", "cat"), rule("words", "catalog", "warn")
+    ruleset = RuleSet([short, long])
+    assert ruleset.match("a catalog") is long
+    assert ruleset.match("the cat sat") is short
+    assert ruleset.match("catalo") is None
+    assert ruleset.match("cats") is None
+
+
+def test_regex_rules_behind_the_prefilter():
+    prefix, longer = rule("regex", r"ab\d"), rule("regex", r"abc\d", "warn")
+    either = rule("regex", r"(?:foo|bar)baz", "log")
+    anything = rule("regex", r"\d{5}", "log")
+    ruleset = RuleSet([prefix, longer, either, anything])
+    assert ruleset.match("x ab1") is prefix
+    assert ruleset.match("x abc1") is longer
+    assert ruleset.match("BARBAZ") is either
+    assert ruleset.match("call 12345") is anything
+    assert ruleset.match("abc foo bar") is None
+
+
+def test_inline_flags_are_accepted():
+    flagged = rule("regex", "(?i)foo")
+    verbose = rule("regex", "(?x) b a r", "warn")
+    ruleset = RuleSet([rule("literal", "sex"), flagged, verbose])
+    assert ruleset.match("FOO") is flagged
+    assert ruleset.match("bar") is verbose
+
+
+def test_many_regex_rules_keep_their_order():
+    rules = [rule("regex", rf"item{index}\b") for index in range(500)]
+    ruleset = RuleSet(rules)
+    assert ruleset.match("take item42 and item7") is rules[42]
+    assert ruleset.match("item4") is rules[4]
@@ -0,0 +1,109 @@
+import asyncio
+
+from medal.medal import Medal
+from tests.fakes import FakeAuthor, FakeBot, FakeChannel, FakeContext, FakeGuild, FakeMessage
+
+MEDAL_LINK = "[Medal.tv](https://medal.tv/?utm_source=discord&utm_content=share_message)"
+
+
+def run_with_cog(test):
+    async def run():
+        cog = Medal(FakeBot())
+        await cog.cog_load()
+        guild = FakeGuild()
+        await test(cog, guild)
+
+    asyncio.run(run())
+
+
+def context(cog, guild):
+    return FakeContext(cog.bot, FakeMessage("!linkfilter", channel=FakeChannel(guild=guild)))
+
+
+def test_default_rule_can_be_removed():
+    async def test(cog, guild):
+        ctx = context(cog, guild)
+        await cog.linkfilter_remove(ctx, "medal")
+        assert ctx.message.reactions == ["✅"]
+        assert await cog.get_rules(guild) == {}
+
+        ctx = context(cog, guild)
+        await cog.linkfilter_list(ctx)
+        assert ctx.sent == ["No rules set."]
+
+        channel = FakeChannel(1349869798103842866, guild=guild)
+        await cog.on_message(FakeMessage(MEDAL_LINK, author=FakeAuthor(307998818547531777), channel=channel))
+        assert cog.pending_deletes == {}
+
+    run_with_cog(test)
+
+
+def test_remove_parses_mentions_like_add():
+    async def test(cog, guild):
+        for field, value in (("users", "<@123>"), ("channels", "<#456>"), ("roles", "<@&789>"), ("domains", "www.Example.com")):
+            await cog.linkfilter_add(context(cog, guild), "spam", field, value=value)
+        assert (await cog.get_rules(guild))["spam"]["users"] == [123]
+
+        for field, value in (("users", "<@123>"), ("channels", "<#456>"), ("roles", "<@&789>"), ("domains", "example.com")):
+            ctx = context(cog, guild)
+            await cog.linkfilter_remove(ctx, "spam", field, value=value)
+            assert ctx.message.reactions == ["✅"]
+
+        rule = (await cog.get_rules(guild))["spam"]
+        assert all(values == [] for values in rule.values())
+
+    run_with_cog(test)
+
+
+def test_remove_reports_when_nothing_was_removed():
+    async def test(cog, guild):
+        await cog.linkfilter_add(context(cog, guild), "spam", "users", value="<@123>")
+
+        for field, value in (("users", "<@999>"), ("colours", "red"), ("users", "nobody")):
+            ctx = context(cog, guild)
+            await cog.linkfilter_remove(ctx, "spam", field, value=value)
+            assert ctx.message.reactions == []
+            assert len(ctx.sent) == 1
+
+        assert (await cog.get_rules(guild))["spam"]["users"] == [123]
+
+    run_with_cog(test)
+
+
+def test_patterns_that_cannot_share_a_regex_still_work_and_reload():
+    async def test(cog, guild):
+        for value in (r"(a)\1", "(?P<x>o)(?P=x)", "(?i)foo"):
+            ctx = context(cog, guild)
+            await cog.linkfilter_add(ctx, "bad", "patterns", value=value)
+            assert ctx.message.reactions == ["✅"], ctx.sent
+        await cog.linkfilter_add(context(cog, guild), "other", "patterns", value="(?P<x>e)(?P=x)")
+
+        reloaded = Medal(cog.bot)
+        reloaded.config = cog.config
+        await reloaded.cog_load()
+        channel = FakeChannel(guild=guild)
+        for content, deleted in (("baa", True), ("moon", True), ("FOO", True), ("see", True), ("abc", False)):
+            message = FakeMessage(content, channel=channel)
+            await reloaded.on_message(message)
+            assert (message in reloaded.pending_deletes.get(channel.id, [])) is deleted, content
+
+    run_with_cog(test)
+
+
+def test_rule_for_other_users_does_not_hide_an_open_rule():
+    async def test(cog, guild):
+        await cog.linkfilter_remove(context(cog, guild), "medal")
+        await cog.linkfilter_add(context(cog, guild), "a", "users", value="1")
+        await cog.linkfilter_add(context(cog, guild), "a", "patterns", value="medal")
+        await cog.linkfilter_add(context(cog, guild), "b", "patterns", value=r"medal\.tv")
+
+        channel = FakeChannel(guild=guild)
+        message = FakeMessage("look medal.tv clip", author=FakeAuthor(2), channel=channel)
+        await cog.on_message(message)
+        assert cog.pending_deletes[channel.id] == [message]
+
+        other = FakeMessage("medal only", author=FakeAuthor(2), channel=channel)
+        await cog.on_message(other)
+        assert other not in cog.pending_deletes[channel.id]
+
+    run_with_cog(test)
@@ -0,0 +1,37 @@
+import asyncio
+import gc
+
+from msgrouter.msgrouter import MessageRouter
+from tests.fakes import FakeBot, FakeMessage
+
+
+class Echo:
+    qualified_name = "Echo"
+
+    def __init__(self):
+        self.seen = []
+
+    def message_route(self):
+        return {"channels": None, "contains": ("ping",)}
+
+    async def on_message(self, message):
+        await asyncio.sleep(0.01)
+        self.seen.append(message.content)
+
+
+def test_router_holds_its_handler_tasks_until_they_finish():
+    async def run():
+        bot = FakeBot()
+        echo = bot.add_cog_sync(Echo())
+        router = await bot.add_cog(MessageRouter(bot))
+
+        await router.on_message(FakeMessage("ping"))
+        await router.on_message(FakeMessage("no match"))
+        assert len(router.tasks) == 1
+
+        gc.collect()
+        await asyncio.sleep(0.05)
+        assert echo.seen == ["ping"]
+        assert router.tasks == set()
+
+    asyncio.run(run())
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from rcon.rconclient import RconError, RconPool
+from tests.rconstub import VanillaRconServer
+
+
+def run_with_server(test, **kwargs):
+    async def run():
+        async with VanillaRconServer(**kwargs) as server:
+            pool = RconPool("127.0.0.1", server.port, "hunter2")
+            try:
+                await test(server, pool)
+            finally:
+                await pool.close()
+
+    asyncio.run(run())
+
+
+def test_whitelist_add_against_vanilla_server():
+    async def test(server, pool):
+        assert await pool.command("whitelist add a") == "Added a to the whitelist"
+        assert await pool.command("whitelist add a") == "Player is already whitelisted"
+        assert server.whitelist == {"a"}
+        assert server.dropped == 0
+        assert server.connections <= 2
+
+    run_with_server(test)
+
+
+def test_split_response_is_reassembled():
+    async def test(server, pool):
+        assert await pool.command("long 10000") == "x" * 10000
+        assert await pool.command("echo still in sync") == "still in sync"
+        assert server.dropped == 0
+
+    run_with_server(test)
+
+
+def test_concurrent_commands_never_share_a_read():
+    async def test(server, pool):
+        responses = await asyncio.gather(*(pool.command(f"echo {i}") for i in range(20)))
+        assert responses == [str(i) for i in range(20)]
+        assert server.dropped == 0
+        assert server.connections <= 2
+
+    run_with_server(test, latency=0.001)
+
+
+def test_dropped_connection_is_reopened():
+    async def test(server, pool):
+        assert await pool.command("echo one") == "one"
+        server.drop_connections()
+        await asyncio.sleep(0.01)
+        assert await pool.command("echo two") == "two"
+        assert await pool.command("echo three") == "three"
+
+    run_with_server(test)
+
+
+def test_wrong_password_fails():
+    async def test(server, pool):
+        with pytest.raises(RconError, match="Authentication failed"):
+            await pool.command("echo hi")
+
+    run_with_server(test, password="other")
+
+
+def test_command_many_runs_a_batch_over_one_connection():
+    async def test(server, pool):
+        names = ["a", "b", "c", "d", "e"]
+        responses = await pool.command_many([f"whitelist add {name}" for name in names])
+        assert responses == [f"Added {name} to the whitelist" for name in names]
+        assert server.whitelist == set(names)
+        assert server.dropped == 0
+        assert server.connections == 1
+
+    run_with_server(test)
+
+
+def test_command_many_keeps_going_after_a_failure():
+    async def test(server, pool):
+        server.crash_on.add("whitelist add b")
+        responses = await pool.command_many([f"whitelist add {name}" for name in "abc"])
+        assert responses[0] == "Added a to the whitelist"
+        assert isinstance(responses[1], RconError)
+        assert responses[2] == "Added c to the whitelist"
+        assert server.commands.count("whitelist add a") == 1
+
+    run_with_server(test)
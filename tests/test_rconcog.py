@@ -0,0 +1,71 @@
+import asyncio
+
+from rcon.rconclient import RconPool
+from rcon.rconcog import RconCog
+from tests.fakes import FakeBot, FakeChannel, FakeContext, FakeGuild, FakeMessage
+from tests.rconstub import VanillaRconServer
+
+
+def run_with_cog(test):
+    async def run():
+        async with VanillaRconServer() as server:
+            cog = RconCog(FakeBot())
+            cog.rcon = RconPool("127.0.0.1", server.port, "hunter2")
+            try:
+                await test(server, cog)
+            finally:
+                await cog.cog_unload()
+
+    asyncio.run(run())
+
+
+def context(cog, content):
+    channel = FakeChannel(guild=FakeGuild())
+    return FakeContext(cog.bot, FakeMessage(content, channel=channel))
+
+
+def test_whitelistadd_five_names():
+    async def test(server, cog):
+        ctx = context(cog, "!whitelistadd a b c d e")
+        await cog.whitelistadd(ctx, "a", "b", "c", "d", "e")
+        assert server.whitelist == {"a", "b", "c", "d", "e"}
+        assert server.dropped == 0
+        assert ctx.message.reactions == ["✅"]
+        assert ctx.sent == ["\n".join(f"`{name}`: added" for name in "abcde")]
+
+    run_with_cog(test)
+
+
+def test_whitelistadd_reports_each_failure():
+    async def test(server, cog):
+        server.whitelist.add("a")
+        server.unknown_players.add("ghost")
+        server.crash_on.add("whitelist add c")
+        ctx = context(cog, "!whitelistadd a ghost c d")
+        await cog.whitelistadd(ctx, "a", "ghost", "c", "d")
+
+        assert server.whitelist == {"a", "d"}
+        assert ctx.message.reactions == ["❌"]
+        summary = ctx.sent[0].split("\n")
+        assert summary[0] == "`a`: already whitelisted"
+        assert summary[1] == "`ghost`: That player does not exist"
+        assert summary[2].startswith("`c`: error: ")
+        assert summary[3] == "`d`: added"
+        assert cog.whitelist == {"a", "d"}
+
+    run_with_cog(test)
+
+
+def test_timeout_is_reported_by_name():
+    async def test(server, cog):
+        async def command_many(commands):
+            return [asyncio.TimeoutError() for _ in commands]
+
+        cog.whitelist = set()
+        cog.whitelist_fetched_at = float("inf")
+        cog.rcon.command_many = command_many
+        ctx = context(cog, "!whitelistadd a")
+        await cog.whitelistadd(ctx, "a")
+        assert ctx.sent == ["`a`: error: TimeoutError"]
+
+    run_with_cog(test)
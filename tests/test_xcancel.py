@@ -0,0 +1,65 @@
+import asyncio
+
+from tests.fakes import FakeBot, FakeChannel, FakeContext, FakeGuild, FakeMessage
+from xcancel.xcancel import XCancel
+
+
+def run_with_cog(test):
+    async def run():
+        cog = XCancel(FakeBot())
+        await cog.cog_load()
+        # t.co lookups are stubbed below, so no HTTP session is needed
+        if asyncio.iscoroutinefunction(getattr(cog.session, "close", None)):
+            await cog.session.close()
+        cog.session = None
+
+        async def resolve_tco(code):
+            return f"https://x.com/user/status/{code}"
+
+        cog.resolve_tco = resolve_tco
+        try:
+            await test(cog, FakeGuild())
+        finally:
+            await cog.cog_unload()
+
+    asyncio.run(run())
+
+
+def context(cog, guild):
+    return FakeContext(cog.bot, FakeMessage("!xcancel", channel=FakeChannel(guild=guild)))
+
+
+def test_default_host_can_be_removed():
+    async def test(cog, guild):
+        ctx = context(cog, guild)
+        await cog.xcancel_remove(ctx, "x.com")
+        assert ctx.message.reactions == ["✅"]
+        assert "x.com" not in await cog.get_rewrites(guild)
+
+        ctx = context(cog, guild)
+        await cog.xcancel_list(ctx)
+        assert "x.com" not in ctx.sent[0]
+        assert "twitter.com" in ctx.sent[0]
+
+        channel = FakeChannel(guild=guild)
+        removed = FakeMessage("https://x.com/user/status/1", channel=channel)
+        kept = FakeMessage("https://twitter.com/user/status/2", channel=channel)
+        await cog.on_message(removed)
+        await cog.on_message(kept)
+        assert removed.replies == []
+        assert kept.replies == ["https://xcancel.com/user/status/2"]
+
+    run_with_cog(test)
+
+
+def test_empty_rewrite_table():
+    async def test(cog, guild):
+        for host in ("x.com", "twitter.com", "mobile.twitter.com"):
+            await cog.xcancel_remove(context(cog, guild), host)
+        assert await cog.get_rewrites(guild) == {}
+
+        message = FakeMessage("https://t.co/abc https://x.com/a/status/1", channel=FakeChannel(guild=guild))
+        await cog.on_message(message)
+        assert message.replies == []
+
+    run_with_cog(test)
@@ -1,27 +1,171 @@
-from redbot.core import commands
+from redbot.core import Config, checks, commands
+import aiohttp
+import asyncio
 import re
+import time
 import discord
 
+DEFAULT_REWRITES = {
+    "x.com": "xcancel.com",
+    "twitter.com": "xcancel.com",
+    "mobile.twitter.com": "xcancel.com",
+}
+
+# how long a link counts as already answered in a channel
+REPOST_WINDOW = 600
+
+
+def normalize_host(host):
+    host = host.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class Rewriter:
+    """One compiled matcher for every host in a guild's rewrite table, plus t.co links."""
+
+    def __init__(self, rewrites):
+        self.rewrites = {host.lower(): target for host, target in rewrites.items()}
+        # an empty table still needs the host group, so it gets an alternative that never matches
+        hosts = "|".join(re.escape(host) for host in sorted(self.rewrites, key=len, reverse=True)) or "(?!)"
+        self.pattern = re.compile(
+            rf"(?P<scheme>https?://)(?:(?:www\.)?(?P<host>{hosts})(?P<path>/\S+)|t\.co/(?P<tco>\w+))",
+            re.IGNORECASE,
+        )
+        self.needles = tuple(self.rewrites) + ("t.co/",)
+
+    def rewrite(self, found):
+        return f"{found['scheme']}{self.rewrites[found['host'].lower()]}{found['path']}"
+
+
+DEFAULT_REWRITER = Rewriter(DEFAULT_REWRITES)
+
 
 class XCancel(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
+        self.config = Config.get_conf(self, identifier=1304388231835422780)
+        # not a dict default: Config would merge its keys back into every read,
+        # so the default hosts could never be removed
+        self.config.register_guild(rewrites=None)
+        self.rewriters = {}
+        self.recent = {}
+        self.tco_cache = {}
+        self.session = None
+
+    async def cog_load(self):
+        self.session = aiohttp.ClientSession()
+        for guild_id, data in (await self.config.all_guilds()).items():
+            if data["rewrites"] is not None:
+                self.rewriters[guild_id] = Rewriter(data["rewrites"])
+
+    async def get_rewrites(self, guild):
+        rewrites = await self.config.guild(guild).rewrites()
+        return dict(DEFAULT_REWRITES) if rewrites is None else rewrites
+
+    def message_route(self):
+        needles = set(DEFAULT_REWRITER.needles)
+        for rewriter in self.rewriters.values():
+            needles |= set(rewriter.needles)
+        return {"contains": tuple(needles), "ignore_bots": True}
+
+    def update_route(self):
+        if router := self.bot.get_cog("MessageRouter"):
+            router.register(self)
+
+    async def cog_unload(self):
+        if router := self.bot.get_cog("MessageRouter"):
+            router.unregister(self)
+        if self.session:
+            await self.session.close()
+
+    async def resolve_tco(self, code):
+        if code in self.tco_cache:
+            return self.tco_cache[code]
+        try:
+            async with self.session.head(f"https://t.co/{code}", allow_redirects=False,
+                                         timeout=aiohttp.ClientTimeout(total=5)) as response:
+                location = response.headers.get("Location")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"t.co lookup failed: {e}")
+            return None
+        if len(self.tco_cache) > 1000:
+            self.tco_cache.clear()
+        self.tco_cache[code] = location
+        return location
+
+    async def rewrite_links(self, rewriter, content):
+        links = []
+        for found in rewriter.pattern.finditer(content):
+            if found["tco"] is None:
+                links.append(rewriter.rewrite(found))
+                continue
+            location = await self.resolve_tco(found["tco"])
+            if location and (unwrapped := rewriter.pattern.match(location)) and unwrapped["host"]:
+                links.append(rewriter.rewrite(unwrapped))
+        return list(dict.fromkeys(links))
+
+    def drop_recent(self, channel_id, links):
+        now = time.monotonic()
+        recent = {link: until for link, until in self.recent.get(channel_id, {}).items() if until > now}
+        fresh = [link for link in links if link not in recent]
+        for link in fresh:
+            recent[link] = now + REPOST_WINDOW
+        self.recent[channel_id] = recent
+        return fresh
 
     @commands.Cog.listener()
     async def on_message(self, message):
-        if message.author.bot:
+        rewriter = self.rewriters.get(message.guild.id, DEFAULT_REWRITER) if message.guild else DEFAULT_REWRITER
+        content = message.content
+        if not any(needle in content for needle in rewriter.needles) or message.author.bot:
+            return
+
+        links = self.drop_recent(message.channel.id, await self.rewrite_links(rewriter, content))
+        if not links:
+            return
+
+        reply_message = " ".join(links)
+        if len(reply_message) > 2000:
+            await message.reply("<:warndreieck:1304388231835422780>", allowed_mentions=discord.AllowedMentions.none())
+            return
+        await message.reply(reply_message, allowed_mentions=discord.AllowedMentions.none())
+        await message.edit(suppress=True)
+
+    async def save_rewrites(self, guild, rewrites):
+        await self.config.guild(guild).rewrites.set(rewrites)
+        self.rewriters[guild.id] = Rewriter(rewrites)
+        self.update_route()
+
+    @commands.group()
+    @commands.guild_only()
+    @checks.admin_or_permissions(manage_guild=True)
+    async def xcancel(self, ctx: commands.Context):
+        """Configure which sites get a front-end link"""
+
+    @xcancel.command(name="add")
+    async def xcancel_add(self, ctx: commands.Context, host: str, target: str):
+        """Rewrite links to `host` to `target`, e.g. `[p]xcancel add instagram.com ddinstagram.com`"""
+        rewrites = await self.get_rewrites(ctx.guild)
+        rewrites[normalize_host(host)] = target.lower()
+        await self.save_rewrites(ctx.guild, rewrites)
+        await ctx.tick()
+
+    @xcancel.command(name="remove")
+    async def xcancel_remove(self, ctx: commands.Context, host: str):
+        """Stop rewriting links to `host`"""
+        rewrites = await self.get_rewrites(ctx.guild)
+        if rewrites.pop(normalize_host(host), None) is None:
+            await ctx.send("That host is not rewritten.")
             return
+        await self.save_rewrites(ctx.guild, rewrites)
+        await ctx.tick()
 
-        pattern = r'https?://(?:www\.)?x\.com\S+'
-        if matches := re.findall(pattern, message.content):
-            xcancel_links = [x_link.replace("x.com", "xcancel.com") for x_link in matches]
-            reply_message = " ".join(xcancel_links)
-            if len(reply_message) > 2000:
-                await message.reply("<:warndreieck:1304388231835422780>", allowed_mentions=discord.AllowedMentions.none())
-                return
-            await message.reply(reply_message, allowed_mentions=discord.AllowedMentions.none())
-            await message.edit(suppress=True)
+    @xcancel.command(name="list")
+    async def xcancel_list(self, ctx: commands.Context):
+        """Show the rewrite table of this server"""
+        rewrites = await self.get_rewrites(ctx.guild)
+        await ctx.send("\n".join(f"`{host}` → `{target}`" for host, target in rewrites.items()) or "No rewrites set.")
 
 
 async def setup(bot):